@@ -0,0 +1,45 @@
+from engine import Engine
+from parallel import ParallelEngine
+from reference import ReferenceEngine
+
+# Compute backends selectable with the "backend" config key:
+#   reference  per-agent Python loops; slow, but the readable specification
+#   numpy      vectorized whole-array phases (the default)
+#   numba      compiled parallel kernels; needs the optional numba package
+BACKENDS = ["reference", "numpy", "numba"]
+DEFAULT_BACKEND = "numpy"
+
+def engine_class(backend):
+    # Engine subclass implementing a backend
+    if backend == "numpy":
+        return Engine
+    if backend == "reference":
+        return ReferenceEngine
+    if backend == "numba":
+        try:
+            from jit import NumbaEngine
+        except ImportError as e:
+            raise ValueError("The numba backend requires the numba package (pip install numba)") from e
+        return NumbaEngine
+    raise ValueError(f"Unknown backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+
+def available_backends():
+    # Backends that can run on this machine
+    available = []
+    for backend in BACKENDS:
+        try:
+            engine_class(backend)
+        except ValueError:
+            continue
+        available.append(backend)
+    return available
+
+def create_engine(config, heatmap=True, population=None, workers=1):
+    # Build the engine for config["backend"]; workers > 1 selects the
+    # multi-process engine, which runs the NumPy phases in every strip
+    backend = config.get("backend", DEFAULT_BACKEND)
+    if workers > 1:
+        if backend != "numpy":
+            raise ValueError(f"Multiple workers are only supported by the numpy backend, not {backend!r}")
+        return ParallelEngine(config, heatmap=heatmap, workers=workers)
+    return engine_class(backend)(config, heatmap=heatmap, population=population)
@@ -0,0 +1,118 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+
+import config_store
+import snapshot
+from backends import create_engine
+from profiler import Profiler, open_sink
+from recorder import Recorder
+
+def build_parser():
+    # Command-line options for a headless batch run; simulation settings come
+    # from config_store (defaults, then --config FILE, then individual flags)
+    parser = argparse.ArgumentParser(description="Run the infection simulation headlessly.")
+    parser.add_argument("--ticks", type=int, default=1000, help="number of ticks to simulate")
+    config_store.add_arguments(parser)
+    parser.add_argument("--workers", type=int, default=1, help="worker processes for the domain-decomposed engine (1 = serial)")
+    parser.add_argument("--heatmap-every", type=int, default=0, help="save a heatmap snapshot every N ticks (0 = none)")
+    parser.add_argument("--out", help="write results to a .npz or .csv file")
+    parser.add_argument("--record", help="stream heatmap frames and S/I/R counts to this recording file")
+    parser.add_argument("--record-every", type=int, default=1, help="record a frame every N ticks")
+    parser.add_argument("--raw-frames", action="store_true", help="record float32 frames instead of quantizing to uint8")
+    parser.add_argument("--no-compress", action="store_true", help="store recorded chunks uncompressed")
+    parser.add_argument("--profile", help="stream per-tick phase timings and statistics to a .csv or .jsonl file")
+    parser.add_argument("--resume", help="continue from a snapshot file instead of a fresh population")
+    parser.add_argument("--snapshot", help="save the final engine state to this snapshot file")
+    return parser
+
+def write_results(path, results):
+    # Save the S/I/R history (and heatmap snapshots for .npz) to disk
+    if path.endswith(".csv"):
+        table = np.column_stack([results["tick"], results["susceptible"], results["infected"], results["recovered"]])
+        np.savetxt(path, table, fmt="%d", delimiter=",", header="tick,susceptible,infected,recovered", comments="")
+    else:
+        np.savez(path, **results)
+
+def run_batch(config, ticks, heatmap_every=0, workers=1, resume=None, snapshot_path=None, recorder_options=None, profile_path=None):
+    # Run a single simulation to completion without any display.
+    # recorder_options, if given, holds Recorder arguments plus "every".
+    heatmap = heatmap_every > 0 or recorder_options is not None
+    if resume and workers > 1:
+        raise ValueError("Resuming from a snapshot is only supported with a single worker")
+    if workers > 1:
+        engine = create_engine(config, heatmap=heatmap, workers=workers)
+    elif resume:
+        engine = snapshot.load(resume)
+        engine.heatmap_enabled = engine.heatmap_enabled or heatmap
+    else:
+        engine = create_engine(config, heatmap=heatmap)
+
+    if profile_path:
+        engine.profiler = Profiler(open_sink(profile_path))
+
+    recorder, on_tick = None, None
+    if recorder_options is not None:
+        options = dict(recorder_options)
+        every = options.pop("every", 1)
+        recorder = Recorder(grid_height=engine.grid_height, grid_width=engine.grid_width, **options)
+
+        def on_tick(engine):
+            if engine.tick % every == 0:
+                recorder.record_engine(engine)
+
+    try:
+        results = engine.run(ticks, heatmap_every, on_tick)
+        if snapshot_path:
+            snapshot.save(engine, snapshot_path)
+    finally:
+        if recorder is not None:
+            recorder.close()
+        if engine.profiler is not None:
+            engine.profiler.close()
+        if workers > 1:
+            engine.close()
+    return results
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.resume:
+        # A snapshot carries its own settings and its engine runs serially
+        if args.workers > 1:
+            parser.error("--resume cannot be combined with --workers")
+        given = [name for name in config_store.SETTINGS if getattr(args, name) is not None]
+        if args.config or given:
+            flags = ["--config"] * bool(args.config) + ["--" + name.replace("_", "-") for name in given]
+            parser.error(f"--resume uses the snapshot's settings; remove {', '.join(flags)}")
+    try:
+        config = config_store.from_args(args)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    recorder_options = None
+    if args.record:
+        recorder_options = {
+            "path": args.record,
+            "every": args.record_every,
+            "quantize": not args.raw_frames,
+            "compress": not args.no_compress,
+        }
+    results = run_batch(config, args.ticks, args.heatmap_every, args.workers, args.resume, args.snapshot, recorder_options, args.profile)
+    elapsed = time.perf_counter() - start
+
+    if args.out:
+        write_results(args.out, results)
+
+    peak = int(np.argmax(results["infected"])) if args.ticks else 0
+    print(f"{args.ticks} ticks in {elapsed:.2f}s ({args.ticks / max(elapsed, 1e-9):.1f} ticks/s)")
+    if args.ticks:
+        print(f"Peak infected: {results['infected'][peak]} at tick {results['tick'][peak]}")
+        print(f"Final S/I/R: {results['susceptible'][-1]}/{results['infected'][-1]}/{results['recovered'][-1]}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
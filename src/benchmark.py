@@ -0,0 +1,151 @@
+import argparse
+import itertools
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from config_store import DEFAULTS
+from backends import BACKENDS, DEFAULT_BACKEND, create_engine
+from engine import PHASES as ENGINE_PHASES
+from profiler import Profiler
+
+# Phases reported per case, as recorded by the engine's profiler
+PHASES = [name for name, _ in ENGINE_PHASES] + ["heatmap"]
+
+# Default benchmark matrix, sized so a full run finishes in a few minutes.
+# Larger populations can be given with --agents; at 10^6 agents on the default
+# world every agent is infected within a few ticks and each tick examines
+# hundreds of millions of candidate pairs.
+AGENT_COUNTS = [10_000, 100_000]
+RADII = [2.5, 5.0]
+INFECTED_FRACTIONS = [0.001, 0.01]
+WORLD_SIZES = ["800x600", "1600x1200"]
+WARMUP_TICKS = 2
+MEMORY_TICKS = 3  # Ticks run under tracemalloc to measure peak memory
+TOLERANCE = 0.10  # Allowed ticks/s drop versus the baseline before flagging
+
+def case_key(case):
+    # Identity of a benchmark case, used to match results against a baseline
+    return (case["agents"], case["infection_radius"], case["infected_fraction"], case["world"], case.get("backend", DEFAULT_BACKEND))
+
+def make_config(case, seed):
+    width, height = (int(v) for v in case["world"].split("x"))
+    return dict(
+        DEFAULTS,
+        agents=case["agents"],
+        initial_infected=max(1, int(case["agents"] * case["infected_fraction"])),
+        infection_radius=case["infection_radius"],
+        world_width=width,
+        world_height=height,
+        backend=case.get("backend", DEFAULT_BACKEND),
+        seed=seed,
+    )
+
+def warm_engine(config):
+    engine = create_engine(config)
+    for _ in range(WARMUP_TICKS):
+        engine.step()
+    return engine
+
+def run_case(case, ticks, seed):
+    # Time the tick pipeline for one case, then time its phases and measure
+    # peak memory in separate runs of the same seed
+    config = make_config(case, seed)
+    engine = warm_engine(config)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        engine.step()
+    elapsed = time.perf_counter() - start
+
+    # The profiler also gathers occupancy statistics every tick, so phase
+    # times come from a second run rather than the timed one
+    engine = warm_engine(config)
+    engine.profiler = Profiler()
+    for _ in range(ticks):
+        engine.step()
+    phase_ms = {name: engine.profiler.mean(name + "_ms") for name in PHASES}
+
+    # Separate short run so tracing overhead does not distort the timings
+    tracemalloc.start()
+    engine = create_engine(config)
+    for _ in range(MEMORY_TICKS):
+        engine.step()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return dict(
+        case,
+        ticks=ticks,
+        seconds=elapsed,
+        ticks_per_sec=ticks / elapsed,
+        phase_ms=phase_ms,
+        peak_memory_mb=peak / 2**20,
+    )
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    # Cases whose throughput dropped by more than tolerance relative to the baseline
+    previous = {case_key(case): case for case in baseline["results"]}
+    regressions = []
+    for case in results:
+        old = previous.get(case_key(case))
+        if old and case["ticks_per_sec"] < old["ticks_per_sec"] * (1 - tolerance):
+            regressions.append((case, old))
+    return regressions
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the headless tick pipeline.")
+    parser.add_argument("--agents", type=int, nargs="+", default=AGENT_COUNTS)
+    parser.add_argument("--infection-radius", type=float, nargs="+", default=RADII)
+    parser.add_argument("--infected-fraction", type=float, nargs="+", default=INFECTED_FRACTIONS)
+    parser.add_argument("--world", nargs="+", default=WORLD_SIZES, help="world sizes as WIDTHxHEIGHT")
+    parser.add_argument("--backend", nargs="+", choices=BACKENDS, default=[DEFAULT_BACKEND])
+    parser.add_argument("--ticks", type=int, default=50, help="timed ticks per case")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--out", help="write results as JSON")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed fractional ticks/s drop")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    cases = [
+        {"agents": agents, "infection_radius": radius, "infected_fraction": fraction, "world": world, "backend": backend}
+        for agents, radius, fraction, world, backend in itertools.product(args.agents, args.infection_radius, args.infected_fraction, args.world, args.backend)
+    ]
+
+    results = []
+    for case in cases:
+        result = run_case(case, args.ticks, args.seed)
+        results.append(result)
+        phases = " ".join(f"{name}={ms:.2f}" for name, ms in result["phase_ms"].items())
+        print(f"agents={case['agents']} radius={case['infection_radius']} infected={case['infected_fraction']} world={case['world']} backend={case['backend']}: "
+              f"{result['ticks_per_sec']:.1f} ticks/s, {result['peak_memory_mb']:.1f} MB peak, ms/tick {phases}")
+
+    if args.out:
+        report = {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "results": results,
+        }
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for case, old in regressions:
+            print(f"REGRESSION agents={case['agents']} radius={case['infection_radius']} infected={case['infected_fraction']} world={case['world']} backend={case['backend']}: "
+                  f"{case['ticks_per_sec']:.1f} ticks/s vs baseline {old['ticks_per_sec']:.1f}")
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,148 @@
-# Global config storage with defaults
-config = {
-    "agents": 10000,
-    "tick_speed": 60,
-    "infection_prob": 0.8,
+import json
+
+try:
+    import tomllib  # Python 3.11+
+except ImportError:
+    tomllib = None
+
+from backends import BACKENDS, DEFAULT_BACKEND
+from infection import DECAY_RATE
+from population import RECOVERY_TICKS, WORLD_WIDTH, WORLD_HEIGHT
+from spatial import SPATIAL_INDEXES, DEFAULT_SPATIAL_INDEX
+
+# Every simulation setting with its type and command-line help. The same keys
+# are used by the menu, the viewer, the engine, snapshot headers, config files
+# and command-line flags (--infection-radius sets infection_radius).
+SETTINGS = {
+    "agents": (int, "number of agents"),
+    "initial_infected": (int, "agents infected at tick 0"),
+    "tick_speed": (float, "viewer ticks per second (0 = unlimited)"),
+    "infection_probability": (float, "chance of infecting a susceptible agent at distance 0"),
+    "infection_radius": (float, "infection distance in world units"),
+    "reinfection_probability": (float, "chance of reinfecting a recovered agent at distance 0"),
+    "decay_rate": (float, "rate at which infection probability decays with distance"),
+    "recovery_ticks": (int, "MIN MAX range of ticks until an infected agent recovers"),
+    "pixel_size": (int, "heatmap cell size in world units"),
+    "world_width": (int, "world width in world units"),
+    "world_height": (int, "world height in world units"),
+    "spatial_index": (str, "rebuild the spatial index every tick, or update it incrementally"),
+    "index_skin": (float, "incremental spatial index skin margin in world units"),
+    "backend": (str, "compute backend for the tick phases"),
+    "seed": (int, "random seed; the same seed reproduces a run exactly"),
+}
+
+# Default configuration, matching the menu defaults
+DEFAULTS = {
+    "agents": 25000,
+    "initial_infected": 1,
+    "tick_speed": 64,
+    "infection_probability": 0.8,
     "infection_radius": 5.0,
-    "reinfection_prob": 0.02,
+    "reinfection_probability": 0.02,
+    "decay_rate": DECAY_RATE,
+    "recovery_ticks": list(RECOVERY_TICKS),
     "pixel_size": 4,
-    "screen_width": 800,
-    "screen_height": 600,
-    "recovery_ticks": (300, 1500),
-}
\ No newline at end of file
+    "world_width": WORLD_WIDTH,
+    "world_height": WORLD_HEIGHT,
+    "spatial_index": DEFAULT_SPATIAL_INDEX,
+    "index_skin": 0.0,
+    "backend": DEFAULT_BACKEND,
+    "seed": None,
+}
+
+def normalize(values):
+    # Convert settings to their declared types, rejecting unknown names
+    normalized = {}
+    for name, value in values.items():
+        if name not in SETTINGS:
+            raise ValueError(f"Unknown setting {name!r}.")
+        kind = SETTINGS[name][0]
+        try:
+            if value is None and name == "seed":
+                normalized[name] = None
+            elif name == "recovery_ticks":
+                low, high = value
+                normalized[name] = [int(low), int(high)]
+            elif kind is int and isinstance(value, float) and not value.is_integer():
+                raise ValueError
+            else:
+                normalized[name] = kind(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid value for {name}: {value!r}.") from None
+    return normalized
+
+def validate(config):
+    # Check a complete configuration and return it; raises ValueError with the
+    # first problem found, worded as in the menu
+    if config["agents"] <= 0:
+        raise ValueError("Number of agents must be greater than 0.")
+    if config["initial_infected"] <= 0 or config["initial_infected"] >= config["agents"]:
+        raise ValueError("Initial infected must be > 0 and < number of agents.")
+    if config["tick_speed"] < 0 or config["tick_speed"] >= 144:
+        raise ValueError("Tick speed must be >= 0 (0 = unlimited) and < 144.")
+    if not (0 < config["infection_probability"] <= 1):
+        raise ValueError("Infection probability must be between 0 and 1.")
+    if config["infection_radius"] <= 0 or config["infection_radius"] >= 100:
+        raise ValueError("Infection radius must be > 0 and < 100.")
+    if not (0 <= config["reinfection_probability"] <= 1):
+        raise ValueError("Reinfection probability must be >= 0 and < 1.")
+    if config["decay_rate"] < 0:
+        raise ValueError("Decay rate must be >= 0.")
+    low, high = config["recovery_ticks"]
+    if low <= 0 or high < low:
+        raise ValueError("Recovery ticks must be a range MIN MAX with 0 < MIN <= MAX.")
+    if config["pixel_size"] <= 0 or config["pixel_size"] > 10:
+        raise ValueError("Pixel size must be > 0 and < 10.")
+    if config["world_width"] < config["pixel_size"] or config["world_height"] < config["pixel_size"]:
+        raise ValueError("World size must be at least one pixel in each direction.")
+    if config["spatial_index"] not in SPATIAL_INDEXES:
+        raise ValueError(f"Spatial index must be one of {', '.join(SPATIAL_INDEXES)}.")
+    if config["index_skin"] < 0:
+        raise ValueError("Index skin must be >= 0.")
+    if config["index_skin"] and config["spatial_index"] != "incremental":
+        raise ValueError("Index skin only applies to the incremental spatial index.")
+    if config["backend"] not in BACKENDS:
+        raise ValueError(f"Backend must be one of {', '.join(BACKENDS)}.")
+    if config["seed"] is not None and config["seed"] < 0:
+        raise ValueError("Seed must be >= 0.")
+    return config
+
+def load_file(path):
+    # Read settings from a .toml file, or JSON otherwise
+    if path.endswith(".toml"):
+        if tomllib is None:
+            raise ValueError("TOML config files need Python 3.11 or newer.")
+        with open(path, "rb") as f:
+            values = tomllib.load(f)
+    else:
+        with open(path) as f:
+            values = json.load(f)
+    return normalize(values)
+
+def resolve(path=None, overrides=None):
+    # Defaults, then settings from the config file, then explicit overrides
+    config = dict(DEFAULTS)
+    if path:
+        config.update(load_file(path))
+    if overrides:
+        config.update(normalize(overrides))
+    return validate(config)
+
+def add_arguments(parser):
+    # Add --config plus one flag per setting; unset flags keep the file or default value
+    parser.add_argument("--config", help="JSON or TOML file of settings")
+    for name, (kind, help) in SETTINGS.items():
+        flag = "--" + name.replace("_", "-")
+        if name == "recovery_ticks":
+            parser.add_argument(flag, type=int, nargs=2, metavar=("MIN", "MAX"), help=help)
+        elif name == "backend":
+            parser.add_argument(flag, choices=BACKENDS, help=help)
+        elif name == "spatial_index":
+            parser.add_argument(flag, choices=SPATIAL_INDEXES, help=help)
+        else:
+            parser.add_argument(flag, type=kind, help=help)
+
+def from_args(args):
+    # Resolve the configuration selected by parsed command-line arguments
+    overrides = {name: getattr(args, name) for name in SETTINGS if getattr(args, name) is not None}
+    return resolve(args.config, overrides)
@@ -0,0 +1,111 @@
+import argparse
+import sys
+
+import numpy as np
+
+from backends import available_backends, create_engine
+from config_store import DEFAULTS
+
+# Conformance suite shared by every compute backend. Each backend runs the same
+# replicated scenario as the reference backend, and its mean S/I/R curves must
+# match the reference's within sampling error at every tick. Random draws are
+# keyed by (tick, agent, pair) rather than taken from a stream, so backends
+# are expected to reproduce the reference exactly; the statistical check is
+# what must pass, and --exact additionally requires identical curves.
+
+# Small, dense scenario so a full epidemic (spread, peak and recoveries) plays
+# out in a few hundred ticks even with the slow reference backend
+SCENARIO = dict(
+    DEFAULTS,
+    agents=1500,
+    initial_infected=15,
+    world_width=160,
+    world_height=120,
+)
+# The incremental spatial index must give the same results as the per-tick
+# rebuild. Each checked backend also runs this smaller, denser world with the
+# incremental index and is compared against its own rebuild-index run; agents
+# crowd into few cells, so full cells are relocated into the reserve and the
+# layout is rebuilt several times per run, with and without a skin.
+INDEX_SCENARIO = dict(
+    SCENARIO,
+    world_width=60,
+    world_height=45,
+    infection_radius=2.5,
+    infection_probability=0.03,
+)
+INDEX_VARIANTS = {
+    "incremental index": dict(spatial_index="incremental", index_skin=0.0),
+    "incremental index, skin 1": dict(spatial_index="incremental", index_skin=1.0),
+}
+TICKS = 200
+REPLICAS = 8
+Z_SCORE = 4.0  # Allowed gap between mean curves, in standard errors
+TOLERANCE = 0.01  # Extra allowed gap, as a fraction of the population
+
+def run_replicas(backend, config, ticks, replicas, seed):
+    # (replicas, ticks, 3) S/I/R counts; replica r uses the same seed for every backend
+    curves = np.empty((replicas, ticks, 3), dtype=np.float64)
+    for r in range(replicas):
+        engine = create_engine(dict(config, backend=backend, seed=[seed, r]), heatmap=False)
+        result = engine.run(ticks)
+        curves[r] = np.column_stack([result["susceptible"], result["infected"], result["recovered"]])
+        if not np.all(curves[r].sum(axis=1) == config["agents"]):
+            raise AssertionError(f"{backend}: S/I/R counts do not add up to the population")
+    return curves
+
+def compare(curves, reference, agents, z=Z_SCORE, tolerance=TOLERANCE):
+    # Largest gap between mean curves relative to the allowed gap (<= 1 passes)
+    diff = np.abs(curves.mean(axis=0) - reference.mean(axis=0))
+    error = np.sqrt(curves.var(axis=0, ddof=1) / len(curves) + reference.var(axis=0, ddof=1) / len(reference))
+    return float((diff / (z * error + tolerance * agents)).max())
+
+def check(label, curves, reference, agents, args, reference_label="reference"):
+    # Print the comparison of curves against reference; returns whether it passed
+    score = compare(curves, reference, agents, args.z, args.tolerance)
+    identical = sum(np.array_equal(c, r) for c, r in zip(curves, reference))
+    peak, reference_peak = curves[..., 1].max(axis=1).mean(), reference[..., 1].max(axis=1).mean()
+    ok = score <= 1 and (identical == args.replicas or not args.exact)
+    print(f"{label}: {'ok' if ok else 'FAIL'} (worst gap {score:.2f} of allowed, {identical}/{args.replicas} replicas identical, "
+          f"mean peak infected {peak:.0f} vs {reference_label} {reference_peak:.0f})")
+    return ok
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Check every compute backend against the reference backend.")
+    parser.add_argument("--backends", nargs="+", help="backends to check (default: every available one)")
+    parser.add_argument("--agents", type=int, default=SCENARIO["agents"])
+    parser.add_argument("--ticks", type=int, default=TICKS)
+    parser.add_argument("--replicas", type=int, default=REPLICAS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--z", type=float, default=Z_SCORE, help="allowed gap in standard errors")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="extra allowed gap as a fraction of the population")
+    parser.add_argument("--exact", action="store_true", help="also fail unless every replica matches the reference exactly")
+    parser.add_argument("--skip-index", action="store_true", help="skip the incremental spatial index checks")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    config = dict(SCENARIO, agents=args.agents, initial_infected=max(1, args.agents // 100))
+    available = available_backends()
+    backends = args.backends or [b for b in available if b != "reference"]
+
+    reference = run_replicas("reference", config, args.ticks, args.replicas, args.seed)
+    failed = False
+    for backend in backends:
+        if backend not in available:
+            print(f"{backend}: SKIPPED (not available on this machine)")
+            continue
+        curves = run_replicas(backend, config, args.ticks, args.replicas, args.seed)
+        failed |= not check(backend, curves, reference, config["agents"], args)
+
+        # The reference backend keeps its own per-cell lists, so only the others use the index
+        if backend == "reference" or args.skip_index:
+            continue
+        rebuild = run_replicas(backend, INDEX_SCENARIO, args.ticks, args.replicas, args.seed)
+        for label, settings in INDEX_VARIANTS.items():
+            curves = run_replicas(backend, dict(INDEX_SCENARIO, **settings), args.ticks, args.replicas, args.seed)
+            failed |= not check(f"{backend}, {label}", curves, rebuild, INDEX_SCENARIO["agents"], args, "rebuild index")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+import numpy as np
+import math
+import time
+
+from infection import InfectionModel, DECAY_RATE
+from spatial import CellIndex, IncrementalCellIndex, DEFAULT_SPATIAL_INDEX
+from population import Population, SUSCEPTIBLE, INFECTED, RECOVERED, RECOVERY_TICKS, WORLD_WIDTH, WORLD_HEIGHT
+from rng import CounterRNG
+from scheduler import TimingWheel
+from timeseries import TimeSeries
+
+HEATMAP_DECAY = 0.975  # Fraction of heatmap intensity kept each tick
+
+# Timed phases of a tick (before the heatmap) and the Engine methods that run them
+PHASES = [
+    ("movement", "move"),
+    ("grid_build", "build_index"),
+    ("recovery", "recover"),
+    ("infection", "infect"),
+]
+
+def heat_deposit(pos, state, width, height, grid_width, grid_height):
+    # Net (infected - recovered) agent count per heatmap cell as one weighted bincount.
+    # Counts are whole numbers, so partial deposits from several workers sum exactly.
+    x = (pos[:, 0] / width * grid_width).astype(np.int64)
+    y = (pos[:, 1] / height * grid_height).astype(np.int64)
+    sign = (state == INFECTED).astype(np.int8) - (state == RECOVERED)
+    inside = (x < grid_width) & (y < grid_height) & (sign != 0)
+    cells = y[inside] * grid_width + x[inside]
+    net = np.bincount(cells, weights=sign[inside], minlength=grid_width * grid_height)
+    return net.reshape(grid_height, grid_width)
+
+class Engine:
+    # Headless simulation engine: owns the population, spatial index, heatmap
+    # and S/I/R history and advances them one tick at a time with no windowing
+    # or frame pacing. The interactive viewer and the batch CLI both drive it.
+    def __init__(self, config, heatmap=True, population=None):
+        # Extract simulation parameters from config dictionary
+        self.config = config
+        self.num_agents = config["agents"]
+        self.width = config.get("world_width", WORLD_WIDTH)
+        self.height = config.get("world_height", WORLD_HEIGHT)
+        self.recovery_ticks = tuple(config.get("recovery_ticks", RECOVERY_TICKS))
+        pixel_size = config["pixel_size"]
+        self.grid_width = self.width // pixel_size
+        self.grid_height = self.height // pixel_size
+
+        # Create the agent population with initial conditions, randomly infecting the initial set,
+        # unless an already initialized population is supplied
+        self.rng = CounterRNG(config.get("seed"))
+        if population is None:
+            population = Population.random(self.num_agents, config["initial_infected"], self.rng, self.width, self.height, self.recovery_ticks)
+        self.pop = population
+        self.model = InfectionModel(
+            config["infection_radius"], config["infection_probability"], config["reinfection_probability"], config.get("decay_rate", DECAY_RATE)
+        )
+        if config.get("spatial_index", DEFAULT_SPATIAL_INDEX) == "incremental":
+            self.grid = IncrementalCellIndex(config["infection_radius"], self.width, self.height, config.get("index_skin", 0.0))
+        else:
+            self.grid = CellIndex(config["infection_radius"], self.width, self.height)
+
+        # Heatmap of infection density; skipped entirely when disabled
+        self.heatmap_enabled = heatmap
+        self.heatmap = np.zeros((self.grid_height, self.grid_width), dtype=np.float32)
+
+        self.profiler = None  # Optional Profiler; timing is skipped entirely when None
+        self.tick = 0  # Simulation tick counter
+        self.counts = self.pop.counts()  # (susceptible, infected, recovered)
+
+        # Infected agents and their pending recoveries, so per-tick infection and
+        # recovery work scales with epidemic activity rather than population size
+        self.wheel = TimingWheel(self.recovery_ticks[1])
+        self.rebuild_active()
+        self.history = TimeSeries()  # Bounded S/I/R history for graphing
+
+    def step(self):
+        # Advance the simulation by one tick
+        self.tick += 1
+        profiler = self.profiler  # Read once; the viewer may swap it from another thread
+        if profiler is not None:
+            self.profiled_step(profiler)
+            return
+        self.move()
+        self.build_index()
+        self.recover()
+        self.infect()
+        self.record()
+        if self.heatmap_enabled:
+            self.update_heatmap()
+
+    def profiled_step(self, profiler):
+        # Same tick as step(), timing each phase and collecting per-tick statistics
+        profiler.begin(self.tick)
+        for name, method in PHASES:
+            start = time.perf_counter()
+            getattr(self, method)()
+            profiler.add(name + "_ms", (time.perf_counter() - start) * 1000)
+        self.record()
+        if self.heatmap_enabled:
+            start = time.perf_counter()
+            self.update_heatmap()
+            profiler.add("heatmap_ms", (time.perf_counter() - start) * 1000)
+
+        occupancy, migrated = self.index_stats()
+        occupied = occupancy[occupancy > 0]
+        profiler.add("candidate_pairs", self.model.candidate_pairs)
+        profiler.add("infected", self.counts[1])
+        if migrated is not None:
+            profiler.add("migrated_agents", migrated)
+        profiler.add("occupied_cells", len(occupied))
+        profiler.add("max_cell_occupancy", int(occupied.max()) if len(occupied) else 0)
+        profiler.add("mean_cell_occupancy", float(occupied.mean()) if len(occupied) else 0.0)
+        profiler.end()
+
+    def index_stats(self):
+        # Agents per spatial index cell and agents that changed cell this tick, for profiling
+        return self.grid.occupancy(), self.grid.migrated
+
+    def move(self):
+        # Update agent positions
+        self.pop.update()
+
+    def build_index(self):
+        # Rebuild the spatial index, or move agents that crossed a cell boundary
+        self.grid.update(self.pop.pos, self.pop.vel)
+
+    def rebuild_active(self):
+        # Derive the infected set, recovery schedule and counts from the agent arrays
+        pop = self.pop
+        self.active = np.flatnonzero(pop.state == INFECTED)
+        due = pop.infection_time[self.active].astype(np.int64) + pop.recovery_time[self.active]
+        self.wheel.clear()
+        self.wheel.schedule(self.active, np.maximum(due, self.tick + 1))
+        self.counts = pop.counts()
+
+    def recover(self):
+        # Recover the agents scheduled for this tick
+        recovered = self.model.recover(self.pop, self.tick, self.wheel.pop_due(self.tick))
+        if len(recovered):
+            self.active = np.setdiff1d(self.active, recovered, assume_unique=True)
+            sus, inf, rec = self.counts
+            self.counts = (sus, inf - len(recovered), rec + len(recovered))
+
+    def transmit(self):
+        # Population indices of this tick's new infections; backends override this
+        return self.model.transmit(self.pop, self.grid, self.rng, self.tick, infectors=self.active)
+
+    def infect(self):
+        # Spread infection from the infected set, schedule the new recoveries and update the counts
+        pop = self.pop
+        infected = self.transmit()
+        if len(infected):
+            from_sus = int(np.count_nonzero(pop.state[infected] == SUSCEPTIBLE))
+            pop.infect(infected, self.tick, self.rng, self.recovery_ticks)
+            self.wheel.schedule(infected, self.tick + pop.recovery_time[infected].astype(np.int64))
+            self.active = np.union1d(self.active, infected)
+            sus, inf, rec = self.counts
+            self.counts = (sus - from_sus, inf + len(infected), rec - (len(infected) - from_sus))
+
+    def rng_state(self):
+        # Exact state of the random stream, for snapshots
+        return self.rng.state()
+
+    def record(self):
+        # Record state counts for graphing
+        self.history.append(self.counts)
+
+    def update_heatmap(self, net=None):
+        # Update heatmap with decay and agent contributions.
+        # net is the per-cell (infected - recovered) agent count; it is
+        # computed from the local population when not supplied.
+        if net is None:
+            net = heat_deposit(self.pop.pos, self.pop.state, self.width, self.height, self.grid_width, self.grid_height)
+        heatmap = self.heatmap
+        heatmap *= HEATMAP_DECAY
+        heatmap += (net * (1.0 / math.sqrt(self.num_agents))).astype(np.float32)
+        np.clip(heatmap, 0, None, out=heatmap)  # Ensure non-negative values
+
+    def run(self, ticks, heatmap_every=0, on_tick=None):
+        # Advance ticks as fast as possible and return the per-tick S/I/R series
+        # plus heatmap snapshots taken every heatmap_every ticks (0 = none).
+        # on_tick, if given, is called with the engine after every tick.
+        counts = np.empty((ticks, 3), dtype=np.int64)
+        snapshots, snapshot_ticks = [], []
+        first_tick = self.tick + 1
+        for i in range(ticks):
+            self.step()
+            counts[i] = self.counts
+            if on_tick is not None:
+                on_tick(self)
+            if heatmap_every and self.tick % heatmap_every == 0:
+                snapshots.append(self.heatmap.copy())
+                snapshot_ticks.append(self.tick)
+        heatmaps = np.array(snapshots, dtype=np.float32).reshape(-1, self.grid_height, self.grid_width)
+        return {
+            "tick": np.arange(first_tick, first_tick + ticks),
+            "susceptible": counts[:, 0],
+            "infected": counts[:, 1],
+            "recovered": counts[:, 2],
+            "heatmaps": heatmaps,
+            "heatmap_ticks": np.array(snapshot_ticks, dtype=np.int64),
+        }
@@ -0,0 +1,88 @@
+import numpy as np
+
+from population import SUSCEPTIBLE, INFECTED
+from rng import INFECTION
+
+DECAY_RATE = 0.5  # Rate at which infection probability decays with distance
+PAIR_BLOCK = 1 << 20  # Candidate pairs examined at once, bounding transmit() memory
+
+class InfectionModel:
+    # Batched, vectorized infection and recovery step.
+    #
+    # Same-tick ordering rule: a tick first recovers every infected agent whose
+    # recovery time has elapsed, then lets every agent that is still infected
+    # try to infect its neighbours. Infectors and target states are both taken
+    # from that post-recovery snapshot, so an agent infected during the tick
+    # only starts spreading on the next one, agents that recovered this tick
+    # can be reinfected at the reinfection probability, and a target reached
+    # by several infectors is infected if any one of their independent draws
+    # succeeds. Each draw is keyed by (tick, infector, target) and the
+    # probability is computed in float64 from the float32 offsets, so the
+    # result does not depend on agent order or on how the work is split up.
+    def __init__(self, radius, base_prob, reinfect_prob, decay_rate=DECAY_RATE):
+        self.radius = radius
+        self.base_prob = base_prob
+        self.reinfect_prob = reinfect_prob
+        self.decay_rate = decay_rate
+        self.candidate_pairs = 0  # Pairs examined by the last transmit(), for profiling
+
+    def recover(self, pop, tick, idx=None):
+        # Recover infected agents whose recovery time has been reached; returns their indices
+        if idx is None:
+            due = (pop.state == INFECTED) & (tick - pop.infection_time >= pop.recovery_time)
+            idx = np.flatnonzero(due)
+        else:
+            due = (pop.state[idx] == INFECTED) & (tick - pop.infection_time[idx] >= pop.recovery_time[idx])
+            idx = idx[due]
+        pop.recover(idx)
+        return idx
+
+    def transmit(self, pop, grid, rng, tick, members=None, targets=None, infectors=None):
+        # Find agents newly infected this tick without modifying the population.
+        # grid indexes pop.pos[members] (or every agent when members is None);
+        # targets optionally restricts which of those members may be infected.
+        # infectors, if known, lists the infected agents (grid indices) so the
+        # population does not have to be scanned for them.
+        # Returns population indices of the new infections.
+        if members is None:
+            state, pos = pop.state, pop.pos
+        else:
+            state, pos = pop.state[members], pop.pos[members]
+        if infectors is None:
+            infectors = np.flatnonzero(state == INFECTED)
+
+        # Work through the infectors in blocks of about PAIR_BLOCK candidate
+        # pairs; draws are keyed per pair, so the split does not change results
+        infected = []
+        self.candidate_pairs = 0
+        if len(infectors):
+            ends = np.cumsum(grid.neighbour_counts(infectors))
+            cuts = np.unique(np.searchsorted(ends, np.arange(PAIR_BLOCK, ends[-1], PAIR_BLOCK)))
+            for block in np.split(infectors, cuts):
+                infected.append(self.transmit_block(pos, state, grid, rng, tick, block, members, targets))
+        return np.unique(np.concatenate(infected)) if infected else np.zeros(0, dtype=np.int64)
+
+    def transmit_block(self, pos, state, grid, rng, tick, infectors, members, targets):
+        # New infections caused by one block of infectors (may contain duplicates)
+        src, dst = grid.pairs(infectors)
+        self.candidate_pairs += len(src)
+
+        # Drop infected targets (including the infector itself) and non-target members
+        keep = state[dst] != INFECTED
+        if targets is not None:
+            keep &= targets[dst]
+        src, dst = src[keep], dst[keep]
+
+        # Distance-decayed probability for every candidate pair within the radius
+        diff = (pos[src] - pos[dst]).astype(np.float64)
+        dist = np.sqrt(diff[:, 0] * diff[:, 0] + diff[:, 1] * diff[:, 1])
+        near = dist <= self.radius
+        src, dst, dist = src[near], dst[near], dist[near]
+        base = np.where(state[dst] == SUSCEPTIBLE, self.base_prob, self.reinfect_prob)
+        p = base * np.exp(-self.decay_rate * dist)
+
+        # One Bernoulli draw per pair; a target is infected if any draw succeeds
+        if members is not None:
+            src, dst = members[src], members[dst]
+        hit = rng.random(INFECTION, tick, src, dst) < p
+        return dst[hit]
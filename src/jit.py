@@ -0,0 +1,104 @@
+import numpy as np
+from numba import njit, prange
+
+from engine import Engine
+from population import SUSCEPTIBLE, INFECTED
+from rng import INFECTION, PHILOX_M0, PHILOX_M1, PHILOX_W0, PHILOX_W1, PHILOX_ROUNDS
+
+# Numba-compiled backend. Movement is a parallel loop over agents and infection
+# a parallel loop over grid cells: each cell's non-infected agents look for
+# infected agents in the surrounding 3x3 cells, so every target is written by
+# exactly one thread and no synchronisation is needed. Compiled kernels are
+# cached on disk, so only the first run on a machine pays the compile time.
+
+MASK32 = np.uint64(0xFFFFFFFF)
+SHIFT32 = np.uint64(32)
+
+@njit(cache=True)
+def philox_random(c0, c1, c2, c3, k0, k1):
+    # Scalar counterpart of CounterRNG.random: Philox4x32-10 block reduced to a
+    # float in [0, 1), bit-identical to the NumPy implementation
+    c0, c1, c2, c3 = np.uint64(c0), np.uint64(c1), np.uint64(c2), np.uint64(c3)
+    k0, k1 = np.uint64(k0), np.uint64(k1)
+    for _ in range(PHILOX_ROUNDS):
+        p0 = c0 * np.uint64(PHILOX_M0)
+        p1 = c2 * np.uint64(PHILOX_M1)
+        c0, c1, c2, c3 = (p1 >> SHIFT32) ^ c1 ^ k0, p1 & MASK32, (p0 >> SHIFT32) ^ c3 ^ k1, p0 & MASK32
+        k0 = (k0 + np.uint64(PHILOX_W0)) & MASK32
+        k1 = (k1 + np.uint64(PHILOX_W1)) & MASK32
+    return (np.float64(c0 >> np.uint64(5)) * 67108864.0 + np.float64(c1 >> np.uint64(6))) * (1.0 / 9007199254740992.0)
+
+@njit(parallel=True, cache=True)
+def move_agents(pos, vel, limits):
+    # Same update as Population.update, one agent per iteration
+    zero = np.float32(0)
+    for i in prange(pos.shape[0]):
+        for axis in range(2):
+            x = pos[i, axis] + vel[i, axis]
+            if x <= zero or x >= limits[axis]:
+                vel[i, axis] = -vel[i, axis]
+                x = min(max(x, zero), limits[axis])
+            pos[i, axis] = x
+
+@njit(parallel=True, cache=True)
+def transmit_cells(pos, state, order, start, end, cell_infected, cols, rows, radius, base_prob, reinfect_prob, decay_rate, tick, k0, k1, hit):
+    # Mark in hit every target infected this tick; returns the number of
+    # (infector, target) pairs examined
+    pairs = 0
+    for c in prange(cols * rows):
+        cx, cy = c % cols, c // cols
+
+        # Skip cells with no infected agent anywhere in their neighbourhood
+        nearby = 0
+        for dy in range(-1, 2):
+            for dx in range(-1, 2):
+                nx, ny = cx + dx, cy + dy
+                if 0 <= nx < cols and 0 <= ny < rows:
+                    nearby += cell_infected[ny * cols + nx]
+        if nearby == 0:
+            continue
+
+        for k in range(start[c], end[c]):
+            j = order[k]
+            if state[j] == INFECTED:
+                continue
+            base = base_prob if state[j] == SUSCEPTIBLE else reinfect_prob
+            infected = False
+            for dy in range(-1, 2):
+                for dx in range(-1, 2):
+                    nx, ny = cx + dx, cy + dy
+                    if infected or nx < 0 or nx >= cols or ny < 0 or ny >= rows:
+                        continue
+                    n = ny * cols + nx
+                    if cell_infected[n] == 0:
+                        continue
+                    for m in range(start[n], end[n]):
+                        i = order[m]
+                        if state[i] != INFECTED:
+                            continue
+                        pairs += 1
+                        ddx = np.float64(pos[i, 0] - pos[j, 0])
+                        ddy = np.float64(pos[i, 1] - pos[j, 1])
+                        dist = np.sqrt(ddx * ddx + ddy * ddy)
+                        if dist <= radius and philox_random(INFECTION, tick, i, j, k0, k1) < base * np.exp(-decay_rate * dist):
+                            infected = True
+                            break
+            hit[j] = infected
+    return pairs
+
+class NumbaEngine(Engine):
+    # Engine whose movement and infection phases run as compiled kernels.
+    # Recovery and index maintenance already only touch the agents involved,
+    # so they are shared with the NumPy engine.
+    def move(self):
+        move_agents(self.pop.pos, self.pop.vel, self.pop.limits)
+
+    def transmit(self):
+        grid, model = self.grid, self.model
+        cell_infected = np.bincount(grid.cell[self.active], minlength=grid.num_cells)
+        hit = np.zeros(len(self.pop), dtype=np.bool_)
+        model.candidate_pairs = transmit_cells(
+            self.pop.pos, self.pop.state, grid.order, grid.start, grid.end, cell_infected, grid.cols, grid.rows,
+            model.radius, model.base_prob, model.reinfect_prob, model.decay_rate, self.tick, *self.rng.key, hit,
+        )
+        return np.flatnonzero(hit)
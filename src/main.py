@@ -1,13 +1,38 @@
-from menu import show_menu
-from simulation import run_simulation
+import argparse
+
+import config_store
+
+def build_parser():
+    # Settings from --config FILE and individual flags prefill the menu, or
+    # start the simulation directly with --no-menu
+    parser = argparse.ArgumentParser(description="Run the infection simulation viewer.")
+    config_store.add_arguments(parser)
+    parser.add_argument("--no-menu", action="store_true", help="skip the menu and start the simulation directly")
+    parser.add_argument("--profile", action="store_true", help="start with the performance overlay enabled")
+    return parser
 
 if __name__ == "__main__":
-    last_settings = None  # Start with no last config, so defaults show first time
+    parser = build_parser()
+    args = parser.parse_args()
+    try:
+        last_settings = config_store.from_args(args)  # Defaults show first time unless a config is given
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    last_settings["profile"] = args.profile
+
+    # GUI modules are imported only once they are needed, so --help and
+    # config errors return without loading pygame, GLFW or OpenGL
+    from simulation import run_simulation
+
+    if args.no_menu:
+        run_simulation(last_settings)
+    else:
+        from menu import show_menu
 
-    while True:
-        settings = show_menu(last_settings)  # Pass last_settings for persistence
-        if settings is None:
-            break  # Allow quitting from the menu
+        while True:
+            settings = show_menu(last_settings)  # Pass last_settings for persistence
+            if settings is None:
+                break  # Allow quitting from the menu
 
-        last_settings = settings  # Save current config to pass back next time
-        run_simulation(settings)
+            last_settings = settings  # Save current config to pass back next time
+            run_simulation(settings)
@@ -1,8 +1,7 @@
 import pygame
 import sys
 
-# Initialize Pygame
-pygame.init()
+from config_store import DEFAULTS, validate
 
 # Constants for screen dimensions and colors
 SCREEN_WIDTH, SCREEN_HEIGHT = 600, 580  # Screen dimensions in pixels
@@ -12,36 +11,35 @@ HIGHLIGHT_COLOR = (255, 215, 0)  # Highlight color (gold), unused here but defin
 INPUT_BG_COLOR = (70, 70, 70)  # Input field background color (darker gray)
 INPUT_ACTIVE_COLOR = (100, 100, 150)  # Active input field color (bluish gray)
 ERROR_COLOR = (200, 50, 50)  # Error message color (red)
-FONT = pygame.font.SysFont(None, 28)  # Default font for input text, size 28
-LABEL_FONT = pygame.font.SysFont(None, 24)  # Default font for labels, size 24
-ERROR_FONT = pygame.font.SysFont(None, 22)  # Default font for error messages, size 22
 MAX_INPUT_LENGTH = 12  # Maximum characters allowed in input fields
 
+# Editable fields: label, config key and type
+FIELDS = [
+    ("Agents", "agents", int),  # Number of agents
+    ("Initial Infected", "initial_infected", int),  # Initial infected agents
+    ("Tick Speed (FPS)", "tick_speed", float),  # Simulation speed in frames per second
+    ("Infection Probability", "infection_probability", float),  # Chance of infection (0 to 1)
+    ("Infection Radius", "infection_radius", float),  # Radius for infection spread
+    ("Reinfection Probability", "reinfection_probability", float),  # Chance of reinfection (0 to 1)
+    ("Pixel Size", "pixel_size", int),  # Size of each heatmap pixel
+]
+
 def show_menu(last_settings=None):
+    # Returns the full configuration to run: last_settings (or the defaults)
+    # with the edited fields applied. Pygame is only initialized here, so
+    # importing this module costs nothing until the menu is shown.
+    pygame.init()
+    font = pygame.font.SysFont(None, 28)  # Default font for input text, size 28
+    label_font = pygame.font.SysFont(None, 24)  # Default font for labels, size 24
+    error_font = pygame.font.SysFont(None, 22)  # Default font for error messages, size 22
+
     # Set up the display window
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     pygame.display.set_caption("Simulation Menu")  # Window title
 
-    # Default simulation parameter values
-    defaults = {
-        "Agents": "25000",  # Number of agents
-        "Initial Infected": "1",  # Initial infected agents
-        "Tick Speed (FPS)": "64",  # Simulation speed in frames per second
-        "Infection Probability": "0.8",  # Chance of infection (0 to 1)
-        "Infection Radius": "5.0",  # Radius for infection spread
-        "Reinfection Probability": "0.02",  # Chance of reinfection (0 to 1)
-        "Pixel Size": "4",  # Size of each heatmap pixel
-    }
-
-    # Initialize input fields with defaults or last settings
-    input_fields = {}
-    for key, default_val in defaults.items():
-        setting_key = key.lower().replace(" ", "_")  # Convert to lowercase and replace spaces with underscores
-        if last_settings and setting_key in last_settings:  # Use previous settings if provided
-            val = last_settings[setting_key]
-            input_fields[key] = {"value": str(val)}
-        else:
-            input_fields[key] = {"value": default_val}  # Use default value
+    # Initialize input fields with last settings or defaults
+    settings = dict(DEFAULTS, **(last_settings or {}))
+    input_fields = {label: {"value": str(settings[key])} for label, key, _ in FIELDS}
 
     keys = list(input_fields.keys())  # List of input field names
     selected_index = 0  # Index of the currently selected field
@@ -74,7 +72,7 @@ def show_menu(last_settings=None):
         for i, key in enumerate(keys):
             y = start_y + i * spacing_y  # Calculate Y position
             # Render and display the label
-            label_surface = LABEL_FONT.render(key, True, TEXT_COLOR)
+            label_surface = label_font.render(key, True, TEXT_COLOR)
             screen.blit(label_surface, (start_x_label, y))
 
             rect = input_rects[i]  # Get the input field's rectangle
@@ -86,19 +84,19 @@ def show_menu(last_settings=None):
 
             val = input_fields[key]["value"]  # Get current input value
             display_text = val[-MAX_INPUT_LENGTH:]  # Truncate to max length
-            text_surface = FONT.render(display_text, True, TEXT_COLOR)
+            text_surface = font.render(display_text, True, TEXT_COLOR)
             screen.blit(text_surface, (rect.x + 8, rect.y + 4))  # Draw text inside box
 
             # Draw blinking cursor if field is selected
             if i == selected_index and cursor_visible:
                 cursor_x = rect.x + 8 + text_surface.get_width() + 2  # Position after text
                 cursor_y = rect.y + 6  # Vertical position
-                cursor_height = FONT.get_height()  # Cursor height matches font
+                cursor_height = font.get_height()  # Cursor height matches font
                 pygame.draw.line(screen, TEXT_COLOR, (cursor_x, cursor_y), (cursor_x, cursor_y + cursor_height), 2)
 
         # Display error message if present
         if error_message:
-            error_surface = ERROR_FONT.render(error_message, True, ERROR_COLOR)
+            error_surface = error_font.render(error_message, True, ERROR_COLOR)
             screen.blit(error_surface, (start_x_label, SCREEN_HEIGHT - 180))
 
         # Display user instructions
@@ -110,7 +108,7 @@ def show_menu(last_settings=None):
             "ESC = Quit",
         ]
         for i, line in enumerate(instructions):
-            instr_surface = LABEL_FONT.render(line, True, (180, 180, 180))  # Lighter gray for instructions
+            instr_surface = label_font.render(line, True, (180, 180, 180))  # Lighter gray for instructions
             screen.blit(instr_surface, (20, SCREEN_HEIGHT - 140 + i * 25))
 
         pygame.display.flip()  # Update the screen
@@ -139,52 +137,18 @@ def show_menu(last_settings=None):
                 elif event.key == pygame.K_RETURN:  # Start simulation on Enter
                     try:
                         # Convert input values to appropriate types
-                        agents = int(input_fields["Agents"]["value"])
-                        initial_infected = int(input_fields["Initial Infected"]["value"])
-                        tick_speed = float(input_fields["Tick Speed (FPS)"]["value"])
-                        infection_probability = float(input_fields["Infection Probability"]["value"])
-                        infection_radius = float(input_fields["Infection Radius"]["value"])
-                        reinfection_probability = float(input_fields["Reinfection Probability"]["value"])
-                        pixel_size = int(input_fields["Pixel Size"]["value"])
-
-                        # Validate inputs and set error messages
-                        if agents <= 0:
-                            error_message = "Number of agents must be greater than 0."
-                            continue
-                        if initial_infected <= 0 or initial_infected >= agents:
-                            error_message = "Initial infected must be > 0 and < number of agents."
-                            continue
-                        if tick_speed <= 0 or tick_speed >= 144:
-                            error_message = "Tick speed must be > 0 and < 144."
-                            continue
-                        if not (0 < infection_probability <= 1):
-                            error_message = "Infection probability must be between 0 and 1."
-                            continue
-                        if infection_radius <= 0 or infection_radius >= 100:
-                            error_message = "Infection radius must be > 0 and < 100."
-                            continue
-                        if not (0 <= reinfection_probability <= 1):
-                            error_message = "Reinfection probability must be >= 0 and < 1."
-                            continue
-                        if pixel_size <= 0 or pixel_size > 10:
-                            error_message = "Pixel size must be > 0 and < 10."
-                            continue
-
-                        # Return validated settings if all checks pass
-                        return {
-                            "agents": agents,
-                            "initial_infected": initial_infected,
-                            "tick_speed": tick_speed,
-                            "infection_probability": infection_probability,
-                            "infection_radius": infection_radius,
-                            "reinfection_probability": reinfection_probability,
-                            "pixel_size": pixel_size,
-                        }
-
+                        values = {key: kind(input_fields[label]["value"]) for label, key, kind in FIELDS}
                     except ValueError:  # Handle non-numeric input
                         error_message = "All inputs must be numeric."
                         continue
 
+                    try:
+                        # Return validated settings if all checks pass
+                        return validate(dict(settings, **values))
+                    except ValueError as e:
+                        error_message = str(e)
+                        continue
+
                 elif event.key == pygame.K_BACKSPACE:  # Delete last character
                     val = input_fields[keys[selected_index]]["value"]
                     input_fields[keys[selected_index]]["value"] = val[:-1]
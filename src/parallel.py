@@ -0,0 +1,244 @@
+import multiprocessing as mp
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from engine import Engine, heat_deposit
+from infection import InfectionModel
+from spatial import CellIndex
+from population import Population, MAX_SPEED
+from rng import CounterRNG
+
+# Agent arrays placed in shared memory, with their per-agent shape suffix and dtype
+AGENT_FIELDS = [
+    ("pos", (2,), np.float32),
+    ("vel", (2,), np.float32),
+    ("state", (), np.uint8),
+    ("infection_time", (), np.int32),
+    ("recovery_time", (), np.int32),
+]
+CONTROL_TICK, CONTROL_STOP = 0, 1  # Slots of the shared control array
+
+class SharedArrays:
+    # A set of named NumPy arrays backed by multiprocessing.shared_memory blocks.
+    # The creating process owns (and unlinks) the blocks; workers attach by name.
+    def __init__(self, specs, create=True):
+        self.specs = specs  # {name: (shm name or None, shape, dtype)}
+        self.blocks = {}
+        self.arrays = {}
+        for name, (shm_name, shape, dtype) in specs.items():
+            size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            if create:
+                block = shared_memory.SharedMemory(create=True, size=size)
+            else:
+                block = shared_memory.SharedMemory(name=shm_name)
+            self.blocks[name] = block
+            self.arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        self.owner = create
+
+    def handles(self):
+        # Picklable description used by workers to attach to the same blocks
+        return {name: (self.blocks[name].name, shape, dtype) for name, (_, shape, dtype) in self.specs.items()}
+
+    def close(self):
+        # Drop array views before closing, then unlink if we created the blocks
+        self.arrays.clear()
+        for block in self.blocks.values():
+            block.close()
+            if self.owner:
+                block.unlink()
+        self.blocks.clear()
+
+def strip_bounds(width, workers):
+    # Left edges of equal-width vertical strips plus the right world edge
+    return np.linspace(0, width, workers + 1)
+
+def strip_of(x, bounds):
+    # Strip index for each x coordinate; the right wall belongs to the last strip
+    return np.clip(np.searchsorted(bounds, x, side="right") - 1, 0, len(bounds) - 2)
+
+def _worker(k, workers, handles, config, bounds, grid_shape, key, tick_barrier, phase_barrier, inboxes):
+    # Worker process entry point: attach to the shared arrays and run strip k
+    shared = SharedArrays(handles, create=False)
+    try:
+        _run_strip(k, workers, shared.arrays, config, bounds, grid_shape, key, tick_barrier, phase_barrier, inboxes)
+    except Exception:
+        # Break the barriers so the coordinator and other workers fail fast
+        tick_barrier.abort()
+        phase_barrier.abort()
+        raise
+    finally:
+        shared.close()
+
+def _run_strip(k, workers, arr, config, bounds, grid_shape, key, tick_barrier, phase_barrier, inboxes):
+    # Simulate the agents whose x coordinate lies in strip k of the world
+    pop = Population(arr["pos"], arr["vel"], arr["state"], arr["infection_time"], arr["recovery_time"], config["width"], config["height"])
+    control, counts = arr["control"], arr["counts"]
+    model = InfectionModel(config["infection_radius"], config["infection_probability"], config["reinfection_probability"], config["decay_rate"])
+    grid = CellIndex(config["infection_radius"], pop.width, pop.height)
+    rng = CounterRNG(key=key)
+    radius = config["infection_radius"]
+    x0, x1 = bounds[k], bounds[k + 1]
+    neighbors = [n for n in (k - 1, k + 1) if 0 <= n < workers]
+    grid_height, grid_width = grid_shape
+
+    # Initial ownership comes from the starting positions
+    owned = np.flatnonzero(strip_of(pop.pos[:, 0], bounds) == k)
+
+    while True:
+        tick_barrier.wait()
+        if control[CONTROL_STOP]:
+            break
+        tick = int(control[CONTROL_TICK])
+
+        # Move owned agents, then split off those that crossed a strip edge
+        pop.update(owned)
+        dest = strip_of(pop.pos[owned, 0], bounds)
+        stay = owned[dest == k]
+        leaving = dest != k
+        leavers, leaver_dest = owned[leaving], dest[leaving]
+        x = pop.pos[stay, 0]
+
+        # Send each neighbour its migrants plus our agents in its halo band
+        for n in neighbors:
+            band = x < x0 + radius if n < k else x >= x1 - radius
+            inboxes[n].put((leavers[leaver_dest == n], stay[band]))
+        arrivals, halo = [], [leavers]
+        for _ in neighbors:
+            migrants, band = inboxes[k].get()
+            arrivals.append(migrants)
+            halo.append(band)
+        owned = np.concatenate([stay] + arrivals)
+
+        # Recoveries only touch owned agents; wait so neighbours see final halo states
+        model.recover(pop, tick, owned)
+        phase_barrier.wait()
+
+        # Owned agents are the only targets; halo agents can only infect
+        members = np.concatenate([owned] + halo)
+        targets = np.zeros(len(members), dtype=bool)
+        targets[:len(owned)] = True
+        grid.build(pop.pos[members])
+        infected = model.transmit(pop, grid, rng, tick, members, targets)
+        phase_barrier.wait()
+        pop.infect(infected, tick, rng, config["recovery_ticks"])
+
+        # Publish per-strip counts, and heatmap deposits when the heatmap is on, for the coordinator
+        state = pop.state[owned]
+        counts[k] = np.bincount(state, minlength=3)[:3]
+        if config["heatmap"]:
+            arr["heat"][k] = heat_deposit(pop.pos[owned], state, pop.width, pop.height, grid_width, grid_height)
+        tick_barrier.wait()
+
+class ParallelEngine(Engine):
+    # Domain-decomposed engine: the world is split into vertical strips, one per
+    # worker process, and all agent arrays live in shared memory. Every tick each
+    # worker moves its own agents, hands agents that crossed a strip edge to the
+    # neighbouring worker and exchanges halo bands at least infection_radius wide
+    # so infections across strip boundaries are found. Workers only ever write
+    # the agents they own, so the shared arrays need no locking.
+    def __init__(self, config, heatmap=True, workers=None):
+        super().__init__(config, heatmap)
+
+        # Strips must be wider than the halo plus one tick of movement
+        workers = workers or os.cpu_count() or 1
+        max_workers = max(1, int(self.width // (config["infection_radius"] + 2 * MAX_SPEED)))
+        self.workers = min(workers, max_workers)
+        bounds = strip_bounds(self.width, self.workers)
+
+        # Move the population into shared memory
+        n = self.num_agents
+        specs = {name: (None, (n,) + suffix, dtype) for name, suffix, dtype in AGENT_FIELDS}
+        specs["control"] = (None, (2,), np.int64)
+        specs["counts"] = (None, (self.workers, 3), np.int64)
+        if heatmap:
+            # Workers only deposit into the heatmap when it is enabled, so heatmap
+            # must be chosen up front for a parallel engine
+            specs["heat"] = (None, (self.workers, self.grid_height, self.grid_width), np.float64)
+        self.shared = SharedArrays(specs)
+        arr = self.shared.arrays
+        for name, _, _ in AGENT_FIELDS:
+            arr[name][:] = getattr(self.pop, name)
+        self.pop = Population(arr["pos"], arr["vel"], arr["state"], arr["infection_time"], arr["recovery_time"], self.width, self.height)
+        arr["control"][:] = 0
+
+        # Start one worker per strip. Draws are keyed by tick and agent ids, so
+        # every worker shares the engine's key and results match a serial run.
+        ctx = mp.get_context()
+        self.tick_barrier = ctx.Barrier(self.workers + 1)
+        phase_barrier = ctx.Barrier(self.workers)
+        inboxes = [ctx.Queue() for _ in range(self.workers)]
+        worker_config = {
+            "width": self.width,
+            "height": self.height,
+            "infection_radius": config["infection_radius"],
+            "infection_probability": config["infection_probability"],
+            "reinfection_probability": config["reinfection_probability"],
+            "decay_rate": self.model.decay_rate,
+            "recovery_ticks": self.recovery_ticks,
+            "heatmap": heatmap,
+        }
+        grid_shape = (self.grid_height, self.grid_width)
+        self.processes = []
+        for k in range(self.workers):
+            args = (k, self.workers, self.shared.handles(), worker_config, bounds, grid_shape, self.rng.key, self.tick_barrier, phase_barrier, inboxes)
+            p = ctx.Process(target=_worker, args=args, daemon=True)
+            p.start()
+            self.processes.append(p)
+
+    def step(self):
+        # Advance the simulation by one tick across all workers.
+        # Worker phases overlap, so profiling reports them as one phase.
+        self.tick += 1
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.begin(self.tick)
+            start = time.perf_counter()
+
+        arr = self.shared.arrays
+        arr["control"][CONTROL_TICK] = self.tick
+        self.tick_barrier.wait()  # Release workers
+        self.tick_barrier.wait()  # Wait for every strip to finish the tick
+
+        sus, inf, rec = arr["counts"].sum(axis=0)
+        self.counts = (int(sus), int(inf), int(rec))
+        self.record()
+        if profiler is not None:
+            profiler.add("workers_ms", (time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+
+        if self.heatmap_enabled:
+            self.update_heatmap()
+        if profiler is not None:
+            profiler.add("heatmap_ms", (time.perf_counter() - start) * 1000)
+            profiler.add("infected", self.counts[1])
+            profiler.end()
+
+    def update_heatmap(self):
+        # Combine the per-strip deposits into the heatmap
+        super().update_heatmap(self.shared.arrays["heat"].sum(axis=0))
+
+    def close(self):
+        # Stop the workers and release the shared memory
+        if not self.processes:
+            return
+        self.pop = Population(*(getattr(self.pop, name).copy() for name, _, _ in AGENT_FIELDS), self.width, self.height)
+        self.shared.arrays["control"][CONTROL_STOP] = 1
+        try:
+            self.tick_barrier.wait(timeout=5)
+        except Exception:
+            pass
+        for p in self.processes:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+        self.processes = []
+        self.shared.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
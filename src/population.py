@@ -0,0 +1,97 @@
+import numpy as np
+
+from rng import CounterRNG, POSITION, VELOCITY, SEEDING, RECOVERY
+
+# Define agent states
+SUSCEPTIBLE, INFECTED, RECOVERED = 0, 1, 2
+
+# World dimensions agents move in
+WORLD_WIDTH, WORLD_HEIGHT = 800, 600
+RECOVERY_TICKS = (30, 100)  # Range for recovery time in ticks
+MAX_SPEED = 0.2  # Velocity components are drawn from [-MAX_SPEED, MAX_SPEED)
+
+class Population:
+    # Columnar (struct-of-arrays) store for the whole agent population.
+    # Row i of every array describes agent i, so the per-tick work runs as
+    # whole-array NumPy operations instead of one Python call per agent.
+    def __init__(self, pos, vel, state, infection_time, recovery_time, width=WORLD_WIDTH, height=WORLD_HEIGHT):
+        self.pos = pos  # (N, 2) float32 positions
+        self.vel = vel  # (N, 2) float32 velocities
+        self.state = state  # (N,) uint8 SUSCEPTIBLE / INFECTED / RECOVERED
+        self.infection_time = infection_time  # (N,) int32 tick of last infection
+        self.recovery_time = recovery_time  # (N,) int32 ticks until recovery
+        self.width = width
+        self.height = height
+        self.limits = np.array([width, height], dtype=np.float32)
+
+    @classmethod
+    def empty(cls, n, width=WORLD_WIDTH, height=WORLD_HEIGHT):
+        # Allocate zeroed arrays for n agents
+        return cls(
+            np.zeros((n, 2), dtype=np.float32),
+            np.zeros((n, 2), dtype=np.float32),
+            np.zeros(n, dtype=np.uint8),
+            np.zeros(n, dtype=np.int32),
+            np.zeros(n, dtype=np.int32),
+            width,
+            height,
+        )
+
+    @classmethod
+    def random(cls, n, initial_infected, rng=None, width=WORLD_WIDTH, height=WORLD_HEIGHT, recovery_ticks=RECOVERY_TICKS):
+        # Uniformly scatter n agents with small random velocities and infect a random subset.
+        # rng is a CounterRNG; every value is keyed by agent id.
+        rng = CounterRNG() if rng is None else rng
+        pop = cls.empty(n, width, height)
+        agents = np.arange(n)
+        for axis, limit in enumerate((width, height)):
+            pop.pos[:, axis] = rng.uniform(0, limit, POSITION, 0, agents, axis)
+            pop.vel[:, axis] = rng.uniform(-MAX_SPEED, MAX_SPEED, VELOCITY, 0, agents, axis)
+        # The initially infected are the agents with the smallest seeding draws
+        k = min(initial_infected, n)
+        seeded = np.argpartition(rng.random(SEEDING, 0, agents), k - 1)[:k] if k else agents[:0]
+        pop.infect(np.sort(seeded), 0, rng, recovery_ticks)
+        return pop
+
+    def copy(self):
+        # Independent copy of every agent array
+        return Population(self.pos.copy(), self.vel.copy(), self.state.copy(), self.infection_time.copy(), self.recovery_time.copy(), self.width, self.height)
+
+    def __len__(self):
+        return len(self.state)
+
+    def update(self, idx=None):
+        # Advance positions by one tick and bounce agents off the walls:
+        # any axis at or past a wall flips its velocity and the position is
+        # clamped back inside the world.
+        if idx is None:
+            pos, vel = self.pos, self.vel
+            pos += vel
+            hit = (pos <= 0) | (pos >= self.limits)
+            np.negative(vel, out=vel, where=hit)
+            np.clip(pos, 0, self.limits, out=pos)
+        else:
+            # Fancy indexing copies, so work on the subset and write it back
+            pos, vel = self.pos[idx], self.vel[idx]
+            pos += vel
+            hit = (pos <= 0) | (pos >= self.limits)
+            np.negative(vel, out=vel, where=hit)
+            np.clip(pos, 0, self.limits, out=pos)
+            self.pos[idx] = pos
+            self.vel[idx] = vel
+
+    def infect(self, idx, tick, rng, recovery_ticks=RECOVERY_TICKS):
+        # Mark agents as infected at this tick with a random recovery time keyed by (tick, agent),
+        # drawn from the inclusive recovery_ticks range
+        self.state[idx] = INFECTED
+        self.infection_time[idx] = tick
+        self.recovery_time[idx] = rng.integers(recovery_ticks[0], recovery_ticks[1] + 1, RECOVERY, tick, idx)
+
+    def recover(self, idx):
+        # Mark agents as recovered
+        self.state[idx] = RECOVERED
+
+    def counts(self):
+        # Number of susceptible, infected and recovered agents
+        sus, inf, rec = np.bincount(self.state, minlength=3)[:3]
+        return int(sus), int(inf), int(rec)
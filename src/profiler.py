@@ -0,0 +1,89 @@
+import csv
+import json
+
+SMOOTHING = 0.1  # Weight of the newest tick in the overlay's moving averages
+
+class CsvSink:
+    # Writes one CSV row per profiled tick; columns come from the first record
+    def __init__(self, path):
+        self.file = open(path, "w", newline="")
+        self.writer = None
+
+    def write(self, record):
+        if self.writer is None:
+            self.writer = csv.DictWriter(self.file, fieldnames=list(record), extrasaction="ignore", restval="")
+            self.writer.writeheader()
+        self.writer.writerow(record)
+
+    def close(self):
+        self.file.close()
+
+class JsonLinesSink:
+    # Writes one JSON object per profiled tick
+    def __init__(self, path):
+        self.file = open(path, "w")
+
+    def write(self, record):
+        self.file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        self.file.close()
+
+def open_sink(path):
+    # Pick the stream format from the file extension (.csv, otherwise JSON lines)
+    return CsvSink(path) if path.endswith(".csv") else JsonLinesSink(path)
+
+class Profiler:
+    # Per-tick instrumentation for the engine. An engine without a profiler
+    # attached skips all timing, so the cost when disabled is a single check
+    # per tick. Each tick produces one flat record of phase timings (*_ms) and
+    # statistics, which is streamed to the optional sink, kept as `last` and
+    # folded into running totals and moving averages.
+    def __init__(self, sink=None):
+        self.sink = sink
+        self.current = {}
+        self.last = {}
+        self.average = {}
+        self.totals = {}
+        self.ticks = 0
+
+    def begin(self, tick):
+        self.current = {"tick": tick}
+
+    def add(self, name, value):
+        self.current[name] = value
+
+    def end(self):
+        # Finish the current tick's record
+        record = self.current
+        average = dict(self.average)
+        for name, value in record.items():
+            if name == "tick":
+                continue
+            self.totals[name] = self.totals.get(name, 0) + value
+            previous = average.get(name, value)
+            average[name] = previous + SMOOTHING * (value - previous)
+        self.average = average  # Swapped in whole so other threads see a consistent dict
+        self.last = record
+        self.ticks += 1
+        if self.sink is not None:
+            self.sink.write(record)
+
+    def mean(self, name):
+        # Average of a value over every profiled tick
+        return self.totals.get(name, 0) / self.ticks if self.ticks else 0.0
+
+    def overlay(self):
+        # One-line summary of the moving averages for a window title
+        average = self.average
+        if not average:
+            return "profiling..."
+        phases = " ".join(f"{name[:-3]} {value:.2f}" for name, value in average.items() if name.endswith("_ms"))
+        return (f"ms/tick: {phases} | pairs {average.get('candidate_pairs', 0):.0f}"
+                f" | infected {average.get('infected', 0):.0f}"
+                f" | cells {average.get('occupied_cells', 0):.0f} max {average.get('max_cell_occupancy', 0):.0f}")
+
+    def close(self):
+        if self.sink is not None:
+            self.sink.close()
+            self.sink = None
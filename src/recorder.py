@@ -0,0 +1,176 @@
+import mmap
+import queue
+import struct
+import threading
+import zlib
+
+import numpy as np
+
+# File layout: a fixed header followed by self-describing chunks appended as the
+# run progresses. Each chunk holds CHUNK_HEADER, then the frame ticks (int64),
+# S/I/R counts (int64 x 3), per-frame scales (float32) and the frame payload.
+# A truncated trailing chunk (e.g. after a crash) is ignored by the reader.
+MAGIC = b"INFREC\x00\x01"
+FILE_HEADER = struct.Struct("<8sIIII")  # magic, grid height, grid width, flags, reserved
+CHUNK_HEADER = struct.Struct("<IIQ")  # frames, flags, payload bytes
+QUANTIZED, COMPRESSED = 1, 2
+CHUNK_FRAMES = 64  # Frames buffered before a chunk is handed to the writer
+QUEUE_CHUNKS = 64  # Chunks allowed to wait for the writer before record() blocks
+
+class Recorder:
+    # Streams heatmap frames and S/I/R counters to an append-only file.
+    # Frames are collected into chunks in the caller's thread (a copy per frame);
+    # quantization, compression and disk writes happen on a background thread.
+    # A failed write is re-raised from the next record(), flush() or close().
+    def __init__(self, path, grid_height, grid_width, quantize=True, compress=True, chunk_frames=CHUNK_FRAMES):
+        self.grid_shape = (grid_height, grid_width)
+        self.flags = (QUANTIZED if quantize else 0) | (COMPRESSED if compress else 0)
+        self.chunk_frames = chunk_frames
+        self.file = open(path, "wb")
+        self.file.write(FILE_HEADER.pack(MAGIC, grid_height, grid_width, self.flags, 0))
+        self._new_chunk()
+        self.queue = queue.Queue(maxsize=QUEUE_CHUNKS)
+        self.error = None  # Exception raised by the writer thread, if any
+        self.writer = threading.Thread(target=self._write_loop, daemon=True)
+        self.writer.start()
+
+    def _new_chunk(self):
+        n = self.chunk_frames
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.counts = np.zeros((n, 3), dtype=np.int64)
+        self.frames = np.zeros((n,) + self.grid_shape, dtype=np.float32)
+        self.size = 0
+
+    def record(self, tick, counts, heatmap):
+        # Append one frame; cheap enough to call from the tick loop
+        i = self.size
+        self.ticks[i] = tick
+        self.counts[i] = counts
+        self.frames[i] = heatmap
+        self.size += 1
+        if self.size == self.chunk_frames:
+            self.flush()
+
+    def record_engine(self, engine):
+        self.record(engine.tick, engine.counts, engine.heatmap)
+
+    def flush(self):
+        # Hand the buffered frames to the writer thread
+        if self.error is not None:
+            raise self.error
+        if self.size:
+            n = self.size
+            self.queue.put((self.ticks[:n], self.counts[:n], self.frames[:n]))
+            self._new_chunk()
+
+    def _encode(self, ticks, counts, frames):
+        # Serialize one chunk, quantizing to uint8 and compressing as configured
+        n = len(ticks)
+        if self.flags & QUANTIZED:
+            scales = frames.reshape(n, -1).max(axis=1).astype(np.float32)
+            safe = np.where(scales > 0, scales, 1.0).astype(np.float32)
+            payload = np.rint(frames / safe[:, None, None] * 255).astype(np.uint8).tobytes()
+        else:
+            scales = np.ones(n, dtype=np.float32)
+            payload = frames.tobytes()
+        if self.flags & COMPRESSED:
+            payload = zlib.compress(payload, 1)
+        return b"".join([CHUNK_HEADER.pack(n, self.flags, len(payload)), ticks.tobytes(), counts.tobytes(), scales.tobytes(), payload])
+
+    def _write_loop(self):
+        # After an error, keep draining the queue so callers never block on it
+        while True:
+            chunk = self.queue.get()
+            if chunk is None:
+                break
+            if self.error is None:
+                try:
+                    self.file.write(self._encode(*chunk))
+                except Exception as e:
+                    self.error = e
+
+    def close(self):
+        # Write any buffered frames and wait for the writer to finish
+        try:
+            self.flush()
+        finally:
+            self.queue.put(None)
+            self.writer.join()
+            self.file.close()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class Recording:
+    # Read-only view of a recording file. The file is memory-mapped and only the
+    # small per-chunk tick/counter arrays are read up front; frames are decoded
+    # on demand, keeping the most recently used chunk decoded.
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, height, width, self.flags, _ = FILE_HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a simulation recording")
+        self.grid_shape = (height, width)
+        frame_size = height * width
+
+        # Index the chunks: where their frames start and how to decode them
+        self.chunks = []  # (first frame, frames, flags, payload offset, payload bytes, scales)
+        ticks, counts = [], []
+        offset, total = FILE_HEADER.size, 0
+        while offset + CHUNK_HEADER.size <= len(self.map):
+            n, flags, length = CHUNK_HEADER.unpack_from(self.map, offset)
+            data = offset + CHUNK_HEADER.size
+            payload = data + n * (8 + 24 + 4)
+            if payload + length > len(self.map):
+                break  # Incomplete trailing chunk
+            ticks.append(np.frombuffer(self.map, np.int64, n, data))
+            counts.append(np.frombuffer(self.map, np.int64, n * 3, data + n * 8).reshape(n, 3))
+            scales = np.frombuffer(self.map, np.float32, n, data + n * 32)
+            self.chunks.append((total, n, flags, payload, length, scales))
+            total += n
+            offset = payload + length
+        self.ticks = np.concatenate(ticks) if ticks else np.zeros(0, dtype=np.int64)
+        self.counts = np.concatenate(counts) if counts else np.zeros((0, 3), dtype=np.int64)
+        self.starts = np.array([c[0] for c in self.chunks], dtype=np.int64)
+        self.frame_size = frame_size
+        self._cached = (None, None)
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def _chunk_frames(self, index):
+        # Decoded (frames, height, width) array for one chunk
+        if self._cached[0] == index:
+            return self._cached[1]
+        _, n, flags, payload, length, scales = self.chunks[index]
+        dtype = np.uint8 if flags & QUANTIZED else np.float32
+        if flags & COMPRESSED:
+            raw = np.frombuffer(zlib.decompress(self.map[payload:payload + length]), dtype)
+        else:
+            raw = np.frombuffer(self.map, dtype, n * self.frame_size, payload)
+        frames = raw.reshape((n,) + self.grid_shape)
+        self._cached = (index, frames)
+        return frames
+
+    def frame(self, i):
+        # Heatmap for frame i as float32
+        index = int(np.searchsorted(self.starts, i, side="right") - 1)
+        first, _, flags, _, _, scales = self.chunks[index]
+        frame = self._chunk_frames(index)[i - first]
+        if flags & QUANTIZED:
+            return frame.astype(np.float32) * (scales[i - first] / 255)
+        return frame
+
+    def close(self):
+        # Drop views into the map before closing it
+        self.ticks = self.counts = None
+        self.chunks = []
+        self._cached = (None, None)
+        self.map.close()
+        self.file.close()
@@ -0,0 +1,92 @@
+import math
+
+import numpy as np
+
+from engine import Engine
+from population import SUSCEPTIBLE, INFECTED, RECOVERED
+from rng import INFECTION, RECOVERY
+
+class ReferenceEngine(Engine):
+    # Readable per-agent implementation of the model: every phase is a plain
+    # Python loop over agents, in the style of the original simulation loop,
+    # with a dict-of-lists grid for neighbour queries. It is far too slow for
+    # large populations, but it is the specification the vectorized backends
+    # are checked against (see conformance.py), so model changes go here first.
+    # Infection follows the same-tick ordering rule documented on InfectionModel.
+    def move(self):
+        # Update position based on velocity, bouncing off walls
+        pos, vel, limits = self.pop.pos, self.pop.vel, self.pop.limits
+        for i in range(len(pos)):
+            for axis in range(2):
+                pos[i, axis] += vel[i, axis]
+                if pos[i, axis] <= 0 or pos[i, axis] >= limits[axis]:
+                    vel[i, axis] *= -1
+                    pos[i, axis] = max(0, min(pos[i, axis], limits[axis]))
+
+    def build_index(self):
+        # Bucket agents into grid cells of infection_radius size
+        size = self.model.radius
+        self.cells = {}
+        for i, (x, y) in enumerate(self.pop.pos):
+            self.cells.setdefault((int(x // size), int(y // size)), []).append(i)
+
+    def index_stats(self):
+        # The dict grid is rebuilt every tick, so there are no migrations to report
+        return np.array([len(members) for members in self.cells.values()], dtype=np.int64), None
+
+    def neighbours(self, i):
+        # All agents in the 3x3 cells around agent i, including i itself
+        size = self.model.radius
+        cx, cy = int(self.pop.pos[i, 0] // size), int(self.pop.pos[i, 1] // size)
+        for dx in [-1, 0, 1]:
+            for dy in [-1, 0, 1]:
+                yield from self.cells.get((cx + dx, cy + dy), [])
+
+    def recover(self):
+        # Agents recover once their recovery time has been reached
+        pop = self.pop
+        for i in range(len(pop)):
+            if pop.state[i] == INFECTED and self.tick - pop.infection_time[i] >= pop.recovery_time[i]:
+                pop.state[i] = RECOVERED
+        self.counts = self.tally()
+
+    def infect(self):
+        # Every agent still infected tries to infect each non-infected neighbour
+        # within the radius; new infections only take effect once all are done
+        pop, model = self.pop, self.model
+        infectors = [i for i in range(len(pop)) if pop.state[i] == INFECTED]
+        newly_infected = set()
+        pairs = 0
+        for a in infectors:
+            near = []  # (target, infection probability) for each neighbour within the radius
+            for b in self.neighbours(a):
+                pairs += 1
+                if pop.state[b] == INFECTED:
+                    continue
+                dx, dy = float(pop.pos[a, 0] - pop.pos[b, 0]), float(pop.pos[a, 1] - pop.pos[b, 1])
+                dist = math.sqrt(dx * dx + dy * dy)
+                if dist <= model.radius:
+                    # Calculate infection probability based on distance
+                    base = model.base_prob if pop.state[b] == SUSCEPTIBLE else model.reinfect_prob
+                    near.append((b, base * math.exp(-model.decay_rate * dist)))
+            if not near:
+                continue
+            # One draw per (infector, target) pair, keyed by the pair
+            draws = self.rng.random(INFECTION, self.tick, a, [b for b, _ in near])
+            for (b, p), u in zip(near, draws):
+                if u < p:
+                    newly_infected.add(b)
+        model.candidate_pairs = pairs
+
+        for b in sorted(newly_infected):
+            pop.state[b] = INFECTED
+            pop.infection_time[b] = self.tick
+            pop.recovery_time[b] = self.rng.integers(self.recovery_ticks[0], self.recovery_ticks[1] + 1, RECOVERY, self.tick, b)
+        self.counts = self.tally()
+
+    def tally(self):
+        # (susceptible, infected, recovered) counted agent by agent
+        counts = [0, 0, 0]
+        for state in self.pop.state:
+            counts[state] += 1
+        return tuple(counts)
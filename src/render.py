@@ -0,0 +1,194 @@
+import ctypes
+
+from OpenGL.GL import *
+from OpenGL.GL.shaders import compileProgram, compileShader
+import numpy as np
+
+from timeseries import OVERVIEW_BUCKETS
+
+SERIES_COLORS = [(0.2, 0.6, 1.0), (1.0, 0.2, 0.2), (0.2, 1.0, 0.2)]  # Susceptible blue, infected red, recovered green
+VERTEX_STRIDE = 3 * 2 * 4  # Bytes per graph slot: an (x, y) float32 pair for each series
+
+# Full-screen quad: texture coordinates follow clip space, so heatmap row 0 is at the bottom
+VERTEX_SHADER = """
+#version 120
+varying vec2 uv;
+void main() {
+    uv = gl_Vertex.xy * 0.5 + 0.5;
+    gl_Position = gl_Vertex;
+}
+"""
+
+# Log-normalize the density against the frame maximum and map it to the red channel
+FRAGMENT_SHADER = """
+#version 120
+uniform sampler2D heatmap;
+uniform float max_value;
+varying vec2 uv;
+void main() {
+    float value = max(texture2D(heatmap, uv).r, 0.0);
+    float normalized = log(1.0 + value) / log(1.0 + max_value + 1e-5);
+    gl_FragColor = vec4(floor(normalized * 255.0) / 255.0, 0.0, 0.0, 1.0);
+}
+"""
+
+class HeatmapRenderer:
+    # Draws the GRID_WIDTH x GRID_HEIGHT heatmap by uploading the raw float grid
+    # into a persistent single-channel texture and scaling it to the window on the
+    # GPU with nearest-neighbour sampling. Must be created and used with the
+    # target window's OpenGL context current.
+    def __init__(self, grid_width, grid_height):
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+
+        # Persistent float texture, updated in place every frame
+        self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_R32F, grid_width, grid_height, 0, GL_RED, GL_FLOAT, None)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+        # Shader program doing normalization and colormapping per fragment
+        self.program = compileProgram(
+            compileShader(VERTEX_SHADER, GL_VERTEX_SHADER),
+            compileShader(FRAGMENT_SHADER, GL_FRAGMENT_SHADER),
+        )
+        self.max_location = glGetUniformLocation(self.program, "max_value")
+        glUseProgram(self.program)
+        glUniform1i(glGetUniformLocation(self.program, "heatmap"), 0)
+        glUseProgram(0)
+        self.max_value = 0.0
+
+    def upload(self, heatmap):
+        # Copy the heatmap into the existing texture storage
+        data = np.ascontiguousarray(heatmap, dtype=np.float32)
+        self.max_value = float(data.max()) if data.size else 0.0
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, self.grid_width, self.grid_height, GL_RED, GL_FLOAT, data)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    def draw(self):
+        # Draw the last uploaded heatmap over the whole viewport
+        glUseProgram(self.program)
+        glUniform1f(self.max_location, self.max_value)
+        glActiveTexture(GL_TEXTURE0)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glBegin(GL_TRIANGLE_STRIP)
+        glVertex2f(-1, -1)
+        glVertex2f(1, -1)
+        glVertex2f(-1, 1)
+        glVertex2f(1, 1)
+        glEnd()
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glUseProgram(0)
+
+    def delete(self):
+        # Release GPU resources
+        glDeleteTextures([self.texture])
+        glDeleteProgram(self.program)
+
+class GraphRenderer:
+    # Draws the S/I/R lines from persistent vertex buffers instead of sending
+    # every point each frame. The recent view is a ring of `points` vertices
+    # per series, and update() uploads only the ticks added since its previous
+    # call; the full-history view holds a minimum and a maximum vertex per
+    # overview bucket and re-uploads only buckets that changed. Must be created
+    # and used with the graph window's OpenGL context current.
+    def __init__(self, points, max_y, buckets=OVERVIEW_BUCKETS):
+        self.points = points
+        self.max_y = max(max_y, 1)
+
+        # CPU copies of the buffers, laid out (slot, series, xy). Slot `points`
+        # repeats slot 0, so the ring's wrap-around is drawn without a gap.
+        self.recent = np.zeros((points + 1, 3, 2), dtype=np.float32)
+        self.recent[:, :, 0] = np.arange(points + 1, dtype=np.float32)[:, None]
+        self.recent_len = 0  # Ticks uploaded so far
+        self.overview = np.zeros((2 * buckets, 3, 2), dtype=np.float32)
+        self.overview[:, :, 0] = (np.arange(2 * buckets, dtype=np.float32) * 0.5)[:, None]  # Bucket b: min at b, max at b + 0.5
+        self.overview_len = 0  # Buckets uploaded
+        self.overview_span = 1
+
+        self.recent_vbo, self.overview_vbo = glGenBuffers(2)
+        for vbo, data in ((self.recent_vbo, self.recent), (self.overview_vbo, self.overview)):
+            glBindBuffer(GL_ARRAY_BUFFER, vbo)
+            glBufferData(GL_ARRAY_BUFFER, data.nbytes, data, GL_DYNAMIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def upload(self, vbo, data, start, stop):
+        # Copy slots start..stop of a CPU buffer into its vertex buffer
+        if stop > start:
+            glBindBuffer(GL_ARRAY_BUFFER, vbo)
+            glBufferSubData(GL_ARRAY_BUFFER, start * VERTEX_STRIDE, (stop - start) * VERTEX_STRIDE, data[start:stop])
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def update(self, history, count, total):
+        # history[:, :count] holds the latest values of a run that is total
+        # ticks long; only ticks not uploaded yet are written to the ring
+        points = self.points
+        new = total - self.recent_len
+        if new < 0 or new >= points:
+            new = count  # Rewound or too far behind: rewrite everything
+        new = min(new, count)
+        first = total - new
+        if new:
+            slots = (first + np.arange(new)) % points
+            self.recent[slots, :, 1] = history[:, count - new:count].T
+            start = first % points
+            self.upload(self.recent_vbo, self.recent, start, min(start + new, points))
+            if start + new > points:
+                self.upload(self.recent_vbo, self.recent, 0, start + new - points)
+            if start == 0 or start + new > points:
+                self.recent[points, :, 1] = self.recent[0, :, 1]
+                self.upload(self.recent_vbo, self.recent, points, points + 1)
+        self.recent_len = total
+
+    def update_overview(self, low, high, count, span):
+        # low/high[:, :count] are the whole-run bucket minima and maxima; the last
+        # uploaded bucket may have been partial, so it is written again
+        start = 0 if span != self.overview_span or count < self.overview_len else max(self.overview_len - 1, 0)
+        if count > start:
+            self.overview[2 * start:2 * count:2, :, 1] = low[:, start:count].T
+            self.overview[2 * start + 1:2 * count:2, :, 1] = high[:, start:count].T
+            self.upload(self.overview_vbo, self.overview, 2 * start, 2 * count)
+        self.overview_len, self.overview_span = count, span
+
+    def draw_strips(self, vbo, strips):
+        # Draw each series as line strips of (first vertex, count, x offset)
+        glBindBuffer(GL_ARRAY_BUFFER, vbo)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        for series, color in enumerate(SERIES_COLORS):
+            glColor3f(*color)
+            glVertexPointer(2, GL_FLOAT, VERTEX_STRIDE, ctypes.c_void_p(series * 8))
+            for first, count, offset in strips:
+                glPushMatrix()
+                glTranslatef(offset, 0, 0)
+                glDrawArrays(GL_LINE_STRIP, first, count)
+                glPopMatrix()
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def draw(self, full_history=False):
+        # Draw the recent ticks scrolling across the window, or the whole run
+        # squeezed into it
+        glLoadIdentity()
+        glTranslatef(-1, -1, 0)
+        if full_history:
+            glScalef(2 / max(self.overview_len, 1), 2 / self.max_y, 1)
+            self.draw_strips(self.overview_vbo, [(0, 2 * self.overview_len, 0)])
+        else:
+            points = self.points
+            glScalef(2 / points, 2 / self.max_y, 1)
+            head = self.recent_len % points if self.recent_len > points else 0  # Slot of the oldest tick shown
+            if head:
+                self.draw_strips(self.recent_vbo, [(head, points - head + 1, -head), (0, head, points - head)])
+            else:
+                self.draw_strips(self.recent_vbo, [(0, min(self.recent_len, points), 0)])
+        glLoadIdentity()
+
+    def delete(self):
+        # Release GPU resources
+        glDeleteBuffers(2, [self.recent_vbo, self.overview_vbo])
@@ -0,0 +1,115 @@
+import argparse
+import sys
+import time
+
+import glfw
+from OpenGL.GL import *
+
+from recorder import Recording
+from render import GraphRenderer, HeatmapRenderer
+from simulation import SCREEN_WIDTH, SCREEN_HEIGHT, GRAPH_WIDTH, GRAPH_HEIGHT, FRAME_INTERVAL
+
+MAX_SPEED = 4096  # Upper limit for playback speed in frames per second
+
+def replay(path, speed=60.0):
+    # Play back a recording without re-simulating.
+    # SPACE = play/pause, LEFT/RIGHT = step (SHIFT = 100 frames),
+    # UP/DOWN = double/halve speed, HOME/END = jump to start/end.
+    recording = Recording(path)
+    if not len(recording):
+        raise ValueError(f"{path} contains no frames")
+    grid_height, grid_width = recording.grid_shape
+    max_y = int(recording.counts[0].sum())  # Population size for the graph's y-axis
+
+    # Initialize GLFW library
+    if not glfw.init():
+        raise Exception("GLFW initialization failed")
+
+    # Create windows
+    main_window = glfw.create_window(SCREEN_WIDTH, SCREEN_HEIGHT, "Infection Replay", None, None)
+    graph_window = glfw.create_window(GRAPH_WIDTH, GRAPH_HEIGHT, "Infection Graph", None, main_window)
+
+    if not main_window or not graph_window:
+        glfw.terminate()
+        raise Exception("Window creation failed")
+
+    glfw.make_context_current(main_window)
+    glClearColor(0, 0, 0, 1)  # Black background
+    heatmap_renderer = HeatmapRenderer(grid_width, grid_height)
+    glfw.make_context_current(graph_window)
+    graph_renderer = GraphRenderer(GRAPH_WIDTH, max_y)
+
+    position = 0.0  # Current frame, fractional while playing
+    playing = True
+    shown = -1  # Frame currently uploaded to the texture
+
+    def on_key(window, key, scancode, action, mods):
+        nonlocal position, playing, speed
+        if action not in (glfw.PRESS, glfw.REPEAT):
+            return
+        step = 100 if mods & glfw.MOD_SHIFT else 1
+        if key == glfw.KEY_SPACE:
+            playing = not playing
+        elif key == glfw.KEY_RIGHT:
+            position = min(int(position) + step, len(recording) - 1)
+        elif key == glfw.KEY_LEFT:
+            position = max(int(position) - step, 0)
+        elif key == glfw.KEY_UP:
+            speed = min(speed * 2, MAX_SPEED)
+        elif key == glfw.KEY_DOWN:
+            speed = max(speed / 2, 1.0)
+        elif key == glfw.KEY_HOME:
+            position = 0
+        elif key == glfw.KEY_END:
+            position = len(recording) - 1
+
+    glfw.set_key_callback(main_window, on_key)
+    glfw.set_key_callback(graph_window, on_key)
+
+    last_time = time.perf_counter()
+    try:
+        while not glfw.window_should_close(main_window) and not glfw.window_should_close(graph_window):
+            now = time.perf_counter()
+            if playing:
+                position = min(position + (now - last_time) * speed, len(recording) - 1)
+            last_time = now
+            current = int(position)
+
+            # Upload the frame only when it changes
+            if current != shown:
+                glfw.make_context_current(main_window)
+                heatmap_renderer.upload(recording.frame(current))
+                shown = current
+                _, infected, recovered = recording.counts[current]
+                state = "playing" if playing else "paused"
+                glfw.set_window_title(main_window, f"Tick {recording.ticks[current]} ({state}, {speed:g} fps) - Infected: {infected}, Recovered: {recovered}")
+
+            # Render heatmap in the main window
+            glfw.make_context_current(main_window)
+            glClear(GL_COLOR_BUFFER_BIT)
+            heatmap_renderer.draw()
+            glfw.swap_buffers(main_window)
+
+            # Render the S/I/R graph up to the current frame
+            glfw.make_context_current(graph_window)
+            glClear(GL_COLOR_BUFFER_BIT)
+            history = recording.counts[max(0, current + 1 - GRAPH_WIDTH):current + 1].T
+            graph_renderer.update(history, history.shape[1], current + 1)  # Only new frames are uploaded while playing
+            graph_renderer.draw()
+            glfw.swap_buffers(graph_window)
+
+            glfw.wait_events_timeout(FRAME_INTERVAL)
+    finally:
+        glfw.terminate()
+        recording.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded simulation.")
+    parser.add_argument("path", help="recording written by batch.py --record")
+    parser.add_argument("--speed", type=float, default=60.0, help="playback speed in frames per second")
+    args = parser.parse_args(argv)
+    replay(args.path, args.speed)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+import numpy as np
+
+# Counter-based random numbers (Philox4x32-10, Salmon et al. 2011).
+# Every random decision in the model is a pure function of the seed and a
+# counter naming the decision: (stream, tick, agent, other agent). Draws do
+# not depend on how many numbers were taken before them or in what order, so
+# serial, vectorized, compiled and multi-process runs all see the same values
+# for the same decisions and produce the same results.
+
+# Streams, one per kind of decision
+POSITION = 1  # Initial position; other = axis
+VELOCITY = 2  # Initial velocity; other = axis
+SEEDING = 3  # Choice of the initially infected agents
+INFECTION = 4  # One draw per (infector, target) pair; agent = infector, other = target
+RECOVERY = 5  # Recovery time of an agent infected at tick
+
+PHILOX_M0, PHILOX_M1 = 0xD2511F53, 0xCD9E8D57  # Round multipliers
+PHILOX_W0, PHILOX_W1 = 0x9E3779B9, 0xBB67AE85  # Key schedule increments
+PHILOX_ROUNDS = 10
+BLOCK = 8192  # Counters per pass, so the working arrays stay in cache
+MASK32 = np.uint64(0xFFFFFFFF)
+SHIFT32 = np.uint64(32)
+
+def philox(c0, c1, c2, c3, k0, k1):
+    # Philox4x32-10 blocks for counters (c0, c1, c2, c3) and key (k0, k1).
+    # Counters may be scalars or broadcastable arrays; returns the four output
+    # words as uint64 arrays holding 32-bit values.
+    shape = np.broadcast_shapes(*(np.shape(c) for c in (c0, c1, c2, c3)))
+    counters = [np.broadcast_to(np.asarray(c, dtype=np.uint64), shape).ravel() for c in (c0, c1, c2, c3)]
+    words = np.empty((4, len(counters[0])), dtype=np.uint64)
+    for start in range(0, words.shape[1], BLOCK):
+        block = words[:, start:start + BLOCK]
+        for word, counter in zip(block, counters):
+            word[:] = counter[start:start + BLOCK]
+        _philox_rounds(block, k0, k1)
+    return tuple(word.reshape(shape) for word in words)
+
+def _philox_rounds(words, k0, k1):
+    # Apply the rounds in place to a (4, n) block of counters
+    c0, c1, c2, c3 = words
+    p0, p1 = np.empty_like(c0), np.empty_like(c0)
+    m0, m1 = np.uint64(PHILOX_M0), np.uint64(PHILOX_M1)
+    k0, k1 = int(k0), int(k1)
+    for _ in range(PHILOX_ROUNDS):
+        np.multiply(c0, m0, out=p0)
+        np.multiply(c2, m1, out=p1)
+        np.right_shift(p1, SHIFT32, out=c0)
+        c0 ^= c1
+        c0 ^= np.uint64(k0)
+        np.bitwise_and(p1, MASK32, out=c1)
+        np.right_shift(p0, SHIFT32, out=c2)
+        c2 ^= c3
+        c2 ^= np.uint64(k1)
+        np.bitwise_and(p0, MASK32, out=c3)
+        k0 = (k0 + PHILOX_W0) & 0xFFFFFFFF
+        k1 = (k1 + PHILOX_W1) & 0xFFFFFFFF
+
+def to_unit(w0, w1):
+    # Float in [0, 1) from the top 53 bits of two 32-bit words
+    return ((w0 >> np.uint64(5)).astype(np.float64) * 67108864.0 + (w1 >> np.uint64(6))) * (1.0 / 9007199254740992.0)
+
+class CounterRNG:
+    # Keyed source of counter-based uniforms. The key is derived from the
+    # seed (any value accepted by np.random.SeedSequence, or None for fresh
+    # entropy) and is all the state there is.
+    def __init__(self, seed=None, key=None):
+        if key is None:
+            key = np.random.SeedSequence(seed).generate_state(2, dtype=np.uint32)
+        self.key = tuple(int(k) for k in key)
+
+    def state(self):
+        # JSON-friendly state, for snapshots
+        return list(self.key)
+
+    def random(self, stream, tick, agent, other=0):
+        # Uniform floats in [0, 1) with 53 random bits, shaped like agent/other
+        w0, w1, _, _ = philox(stream, tick, agent, other, *self.key)
+        return to_unit(w0, w1)
+
+    def uniform(self, low, high, stream, tick, agent, other=0):
+        return low + (high - low) * self.random(stream, tick, agent, other)
+
+    def integers(self, low, high, stream, tick, agent, other=0):
+        # Integers in [low, high)
+        return low + (self.random(stream, tick, agent, other) * (high - low)).astype(np.int64)
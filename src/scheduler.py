@@ -0,0 +1,39 @@
+import numpy as np
+
+class TimingWheel:
+    # Timing wheel (bucket queue) of agents keyed by the tick they are due.
+    # With one bucket per tick over a horizon at least as long as the furthest
+    # tick ever scheduled ahead, every bucket only ever holds agents due at a
+    # single tick, so popping the current tick touches nothing but the agents
+    # due now. The engine queues recoveries on one; the incremental spatial
+    # index queues boundary checks on another.
+    def __init__(self, horizon):
+        self.size = horizon + 1
+        self.buckets = [[] for _ in range(self.size)]
+
+    def schedule(self, idx, due):
+        # Queue agents idx for the matching ticks in due
+        if len(idx) == 0:
+            return
+        # Due ticks span less than the wheel, so a 16-bit radix sort groups them
+        keys = due - due.min()
+        if self.size <= 1 << 16:
+            keys = keys.astype(np.uint16)
+        order = np.argsort(keys, kind="stable")
+        idx, due = idx[order], due[order]
+        first = np.flatnonzero(due[1:] != due[:-1]) + 1
+        ticks = due[np.concatenate(([0], first))]
+        for tick, part in zip(ticks.tolist(), np.split(idx, first)):
+            self.buckets[tick % self.size].append(part)
+
+    def pop_due(self, tick):
+        # Remove and return the agents due at tick
+        slot = tick % self.size
+        bucket = self.buckets[slot]
+        if not bucket:
+            return np.zeros(0, dtype=np.int64)
+        self.buckets[slot] = []
+        return np.concatenate(bucket)
+
+    def clear(self):
+        self.buckets = [[] for _ in range(self.size)]
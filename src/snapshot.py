@@ -0,0 +1,100 @@
+import json
+import struct
+
+import numpy as np
+
+from backends import create_engine
+from population import Population
+from rng import CounterRNG
+from timeseries import TimeSeries
+
+# File layout: MAGIC, little-endian uint64 header length, JSON header, then raw
+# arrays each starting at an ALIGNMENT-byte offset recorded in the header.
+MAGIC = b"INFSNAP\x03"
+ALIGNMENT = 64
+POPULATION_FIELDS = ["pos", "vel", "state", "infection_time", "recovery_time"]
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def save(engine, path):
+    # Write the full engine state at its current tick to path
+    arrays = {name: getattr(engine.pop, name) for name in POPULATION_FIELDS}
+    arrays["heatmap"] = engine.heatmap
+    arrays["history"] = engine.history.recent
+    arrays["history_low"] = engine.history.low
+    arrays["history_high"] = engine.history.high
+
+    header = {
+        "config": engine.config,
+        "tick": engine.tick,
+        "counts": list(engine.counts),
+        "heatmap_enabled": engine.heatmap_enabled,
+        "world": [engine.pop.width, engine.pop.height],
+        "rng": engine.rng_state(),
+        "history": {"length": engine.history.length, "span": engine.history.span},
+        "arrays": {},
+    }
+
+    # Lay the arrays out after the header; the header size depends on the offsets,
+    # so grow the reserved space until the layout is stable
+    reserved = ALIGNMENT
+    while True:
+        offset = _align(len(MAGIC) + 8 + reserved)
+        for name, arr in arrays.items():
+            header["arrays"][name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+            offset = _align(offset + arr.nbytes)
+        encoded = json.dumps(header).encode("utf-8")
+        if len(encoded) <= reserved:
+            break
+        reserved = _align(len(encoded))
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", reserved))
+        f.write(encoded.ljust(reserved, b" "))
+        for name, arr in arrays.items():
+            f.seek(header["arrays"][name]["offset"])
+            f.write(np.ascontiguousarray(arr).tobytes())
+
+def read_header(path):
+    # Parse just the JSON header of a snapshot
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a simulation snapshot")
+        (length,) = struct.unpack("<Q", f.read(8))
+        return json.loads(f.read(length))
+
+def load(path, mmap=True):
+    # Restore an Engine from a snapshot. With mmap the agent arrays are mapped
+    # copy-on-write, so restoring is near-instant and the file is never modified.
+    header = read_header(path)
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype, shape, offset = np.dtype(spec["dtype"]), tuple(spec["shape"]), spec["offset"]
+        if mmap and np.prod(shape) > 0:
+            arrays[name] = np.memmap(path, dtype=dtype, mode="c", offset=offset, shape=shape)
+        else:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                arrays[name] = np.fromfile(f, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+
+    width, height = header["world"]
+    pop = Population(*(arrays[name] for name in POPULATION_FIELDS), width, height)
+    engine = create_engine(header["config"], heatmap=header["heatmap_enabled"], population=pop)
+    engine.rng = CounterRNG(key=header["rng"])
+    engine.tick = header["tick"]
+    engine.rebuild_active()
+    engine.heatmap[:] = arrays["heatmap"]
+    engine.history = TimeSeries.restore(arrays["history"], arrays["history_low"], arrays["history_high"], **header["history"])
+    return engine
+
+def fork(path, seeds, mmap=True):
+    # Restore one engine per seed from the same snapshot. Each continuation gets
+    # its own random stream, so they diverge from the snapshot tick onwards.
+    engines = []
+    for seed in seeds:
+        engine = load(path, mmap)
+        engine.rng = CounterRNG(seed)
+        engines.append(engine)
+    return engines
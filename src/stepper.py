@@ -0,0 +1,117 @@
+import threading
+import time
+
+import numpy as np
+
+from timeseries import OVERVIEW_BUCKETS
+
+MAX_CATCHUP_TICKS = 8  # Paced mode drops backlog beyond this many ticks per wake-up
+
+class Frame:
+    # Snapshot of everything the viewer draws for one simulation tick
+    def __init__(self, grid_height, grid_width, history_points, overview_buckets=OVERVIEW_BUCKETS):
+        self.tick = 0
+        self.counts = (0, 0, 0)
+        self.heatmap = np.zeros((grid_height, grid_width), dtype=np.float32)
+        self.history = np.zeros((3, history_points), dtype=np.int64)  # Most recent S/I/R values
+        self.history_len = 0  # Number of valid points at the start of history
+        self.history_total = 0  # Ticks recorded over the whole run
+        self.overview_low = np.zeros((3, overview_buckets), dtype=np.int64)  # Whole-run min/max buckets
+        self.overview_high = np.zeros((3, overview_buckets), dtype=np.int64)
+        self.overview_len = 0  # Number of valid buckets
+        self.overview_span = 1  # Ticks per bucket
+
+    def capture(self, engine):
+        # Copy the engine's current state into this frame's preallocated arrays
+        self.tick = engine.tick
+        self.counts = engine.counts
+        self.heatmap[:] = engine.heatmap
+        history = engine.history
+        self.history_len = history.copy_recent(self.history)
+        self.history_total = len(history)
+        self.overview_len = history.copy_overview(self.overview_low, self.overview_high)
+        self.overview_span = history.span
+
+class FrameBuffer:
+    # Double-buffered frames shared between the simulation and render threads.
+    # The simulation fills the back frame without locking and publish() swaps it
+    # to the front; the renderer holds the lock only while reading the front
+    # frame, so the two threads never touch the same frame at once.
+    def __init__(self, grid_height, grid_width, history_points, overview_buckets=OVERVIEW_BUCKETS):
+        self.frames = [Frame(grid_height, grid_width, history_points, overview_buckets) for _ in range(2)]
+        self.front = 0
+        self.version = 0  # Incremented on every publish
+        self.lock = threading.Lock()
+
+    def back(self):
+        # Frame the simulation thread may write to
+        return self.frames[1 - self.front]
+
+    def publish(self):
+        # Make the back frame visible to the renderer
+        with self.lock:
+            self.front = 1 - self.front
+            self.version += 1
+
+    def acquire(self):
+        # Lock and return the front frame; pair with release()
+        self.lock.acquire()
+        return self.frames[self.front]
+
+    def release(self):
+        self.lock.release()
+
+class SimulationThread(threading.Thread):
+    # Steps the engine on a background thread and publishes a frame after each
+    # batch of ticks. With tick_speed > 0 a fixed-timestep accumulator runs the
+    # simulation at that rate and sleeps between ticks; with tick_speed == 0 it
+    # runs as fast as possible.
+    def __init__(self, engine, frames, tick_speed):
+        super().__init__(daemon=True)
+        self.engine = engine
+        self.frames = frames
+        self.interval = 1.0 / tick_speed if tick_speed > 0 else 0.0
+        self.stop_event = threading.Event()
+        self.error = None  # Exception raised by the simulation, if any
+
+    def publish(self):
+        self.frames.back().capture(self.engine)
+        self.frames.publish()
+
+    def run(self):
+        try:
+            self.publish()
+            if self.interval:
+                self.run_paced()
+            else:
+                while not self.stop_event.is_set():
+                    self.engine.step()
+                    self.publish()
+        except Exception as e:
+            self.error = e
+
+    def run_paced(self):
+        # Fixed-timestep accumulator: run one tick per elapsed interval
+        accumulator = 0.0
+        previous = time.perf_counter()
+        while not self.stop_event.is_set():
+            now = time.perf_counter()
+            accumulator += now - previous
+            previous = now
+
+            ticks = 0
+            while accumulator >= self.interval and ticks < MAX_CATCHUP_TICKS:
+                self.engine.step()
+                accumulator -= self.interval
+                ticks += 1
+            if ticks == MAX_CATCHUP_TICKS:
+                accumulator = 0.0  # Fall behind gracefully instead of spiralling
+            if ticks:
+                self.publish()
+
+            # Sleep until the next tick is due (or until asked to stop)
+            self.stop_event.wait(max(0.0, self.interval - accumulator))
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
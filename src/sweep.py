@@ -0,0 +1,127 @@
+import argparse
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import config_store
+from backends import BACKENDS, create_engine
+from config_store import DEFAULTS
+from population import Population
+from rng import CounterRNG
+
+# Parameters that can be swept; agents and initial_infected determine the starting population
+SWEEP_PARAMS = ["agents", "initial_infected", "infection_probability", "infection_radius", "reinfection_probability"]
+QUANTILES = (0.05, 0.5, 0.95)  # Bands reported around the mean curve
+
+def parameter_grid(values, base=DEFAULTS):
+    # Expand {name: [values...]} into one config dict per combination of base
+    names = list(values)
+    return [dict(base, **dict(zip(names, combo))) for combo in itertools.product(*(values[n] for n in names))]
+
+# Starting populations built in this worker process, so configs that only
+# differ in swept infection parameters reuse one population per replica
+_populations = {}
+
+def _initial_population(config, seed, replica):
+    # Copy of the replica's starting population, built on first use
+    key = (config["agents"], config["initial_infected"], seed, replica, config["world_width"], config["world_height"], tuple(config["recovery_ticks"]))
+    if key not in _populations:
+        init_rng = CounterRNG([seed, replica])
+        _populations[key] = Population.random(config["agents"], config["initial_infected"], init_rng, config["world_width"], config["world_height"], config["recovery_ticks"])
+    return _populations[key].copy()
+
+def _run_replica(index, config, replica, seed, ticks):
+    # Run one replica of one config and return its S/I/R series
+    population = _initial_population(config, seed, replica)
+    engine = create_engine(dict(config, seed=[seed, replica, index]), heatmap=False, population=population)
+    series = np.empty((ticks + 1, 3), dtype=np.int32)
+    series[0] = engine.counts
+    for t in range(1, ticks + 1):
+        engine.step()
+        series[t] = engine.counts
+    return index, replica, series
+
+def run_sweep(configs, replicas, ticks, workers=None, seed=0):
+    # Run replicas of every config over a process pool, one task per (config, replica).
+    # Returns a preallocated (configs, replicas, ticks + 1, 3) array of S/I/R
+    # counts, where row 0 is the initial state.
+    results = np.zeros((len(configs), replicas, ticks + 1, 3), dtype=np.int32)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Replica-major order, so a worker tends to pick up configs sharing the population it just built
+        futures = [
+            pool.submit(_run_replica, index, config, replica, seed, ticks)
+            for replica in range(replicas)
+            for index, config in enumerate(configs)
+        ]
+        # Stream each replica's series into the results array as it finishes
+        for future in as_completed(futures):
+            index, replica, series = future.result()
+            results[index, replica] = series
+    return results
+
+def summarize(results, quantiles=QUANTILES):
+    # Per-tick mean and quantile bands plus peak-infection statistics per config
+    infected = results[..., 1]
+    peaks = infected.max(axis=2)
+    peak_ticks = infected.argmax(axis=2)
+    return {
+        "mean": results.mean(axis=1),  # (configs, ticks + 1, 3)
+        "quantiles": np.quantile(results, quantiles, axis=1),  # (quantiles, configs, ticks + 1, 3)
+        "peak_infected": peaks,  # (configs, replicas)
+        "peak_tick": peak_ticks,  # (configs, replicas)
+        "peak_infected_mean": peaks.mean(axis=1),
+        "peak_infected_quantiles": np.quantile(peaks, quantiles, axis=1),
+        "peak_tick_mean": peak_ticks.mean(axis=1),
+    }
+
+def build_parser():
+    # Each sweepable parameter accepts a list of values to combine
+    parser = argparse.ArgumentParser(description="Run replicated parameter sweeps of the infection simulation.")
+    for name in SWEEP_PARAMS:
+        kind = int if name in ("agents", "initial_infected") else float
+        parser.add_argument("--" + name.replace("_", "-"), type=kind, nargs="+", help=f"values to sweep (default: the configured {name})")
+    parser.add_argument("--config", help="JSON or TOML file of base settings for every run")
+    parser.add_argument("--backend", choices=BACKENDS, help="compute backend for every run")
+    parser.add_argument("--replicas", type=int, default=10, help="stochastic replicas per combination")
+    parser.add_argument("--ticks", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="process pool size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write raw results and summary statistics to a .npz file")
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.seed < 0:
+        parser.error("--seed must be >= 0")
+    try:
+        base = config_store.resolve(args.config, {"backend": args.backend} if args.backend else None)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    configs = parameter_grid({name: getattr(args, name) or [base[name]] for name in SWEEP_PARAMS}, base)
+    for config in configs:
+        # Reject bad combinations before any job is submitted
+        try:
+            config_store.validate(config)
+        except ValueError as e:
+            label = ", ".join(f"{name}={config[name]}" for name in SWEEP_PARAMS)
+            parser.error(f"{label}: {e}")
+    results = run_sweep(configs, args.replicas, args.ticks, args.workers, args.seed)
+    summary = summarize(results)
+
+    if args.out:
+        params = {name: np.array([c[name] for c in configs]) for name in SWEEP_PARAMS}
+        np.savez(args.out, results=results, quantile_levels=np.array(QUANTILES), **params, **summary)
+
+    # Print one line of peak statistics per combination
+    for i, config in enumerate(configs):
+        low, mid, high = summary["peak_infected_quantiles"][:, i]
+        label = ", ".join(f"{name}={config[name]}" for name in SWEEP_PARAMS)
+        print(f"{label}: peak infected {summary['peak_infected_mean'][i]:.1f} [{low:.0f}, {mid:.0f}, {high:.0f}] at tick {summary['peak_tick_mean'][i]:.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
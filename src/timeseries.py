@@ -0,0 +1,75 @@
+import numpy as np
+
+RECENT_TICKS = 4096  # Ticks kept at full resolution
+OVERVIEW_BUCKETS = 1024  # Min/max buckets covering the whole run (must be even)
+
+class TimeSeries:
+    # Bounded per-tick history of a few integer channels (the S/I/R counts).
+    # The most recent ticks live in a preallocated ring buffer at full
+    # resolution; the whole run is kept as per-bucket minima and maxima, and
+    # when the buckets fill up, neighbouring pairs are merged and the ticks per
+    # bucket double. Memory is fixed however long the run is.
+    def __init__(self, channels=3, recent=RECENT_TICKS, buckets=OVERVIEW_BUCKETS):
+        self.recent = np.zeros((channels, recent), dtype=np.int64)  # Ring buffer, indexed by tick % recent
+        self.low = np.zeros((channels, buckets), dtype=np.int64)  # Per-bucket minimum
+        self.high = np.zeros((channels, buckets), dtype=np.int64)  # Per-bucket maximum
+        self.span = 1  # Ticks per bucket
+        self.length = 0  # Ticks appended so far
+
+    def __len__(self):
+        return self.length
+
+    def append(self, values):
+        # Add one tick's values
+        t = self.length
+        self.recent[:, t % self.recent.shape[1]] = values
+        bucket, offset = divmod(t, self.span)
+        if bucket == self.low.shape[1]:
+            self.compact()
+            bucket, offset = divmod(t, self.span)
+        if offset == 0:
+            self.low[:, bucket] = values
+            self.high[:, bucket] = values
+        else:
+            np.minimum(self.low[:, bucket], values, out=self.low[:, bucket])
+            np.maximum(self.high[:, bucket], values, out=self.high[:, bucket])
+        self.length = t + 1
+
+    def compact(self):
+        # Merge neighbouring buckets into the first half, doubling the span
+        half = self.low.shape[1] // 2
+        self.low[:, :half] = np.minimum(self.low[:, 0::2], self.low[:, 1::2])
+        self.high[:, :half] = np.maximum(self.high[:, 0::2], self.high[:, 1::2])
+        self.span *= 2
+
+    def buckets(self):
+        # Number of buckets in use, including a partially filled last one
+        return -(-self.length // self.span)
+
+    def copy_recent(self, out):
+        # Copy the most recent ticks, oldest first, into the start of out and
+        # return how many were copied
+        capacity = self.recent.shape[1]
+        n = min(out.shape[1], self.length, capacity)
+        first = (self.length - n) % capacity
+        head = min(n, capacity - first)
+        out[:, :head] = self.recent[:, first:first + head]
+        out[:, head:n] = self.recent[:, :n - head]
+        return n
+
+    def copy_overview(self, low, high):
+        # Copy the buckets in use into low and high and return how many there are
+        n = self.buckets()
+        low[:, :n] = self.low[:, :n]
+        high[:, :n] = self.high[:, :n]
+        return n
+
+    @classmethod
+    def restore(cls, recent, low, high, length, span):
+        # Rebuild a series from its arrays, as saved in snapshots
+        series = cls(recent.shape[0], recent.shape[1], low.shape[1])
+        series.recent[:] = recent
+        series.low[:] = low
+        series.high[:] = high
+        series.length, series.span = length, span
+        return series